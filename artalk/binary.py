@@ -0,0 +1,162 @@
+import struct
+import sys
+from array import array
+from typing import List, BinaryIO, NamedTuple
+
+from artalk.codeblocks import Block, Patch
+from artalk.parser import Code
+
+# Layout (all little-endian, every section padded to 4 bytes):
+#   header   MAGIC, VERSION, code count, block count, patch count, title bytes, payload bytes, line count
+#   codes    uint32 block count per code
+#   titles   uint32 UTF-8 length per code, followed by the UTF-8 titles
+#   blocks   (first, second) uint32 record per block
+#   patches  uint32 payload length per Patch block (in block order), followed by the payloads
+#   lines    uint32 source line count per code, followed by the source line of each of those blocks
+
+MAGIC = b"ARTK"
+VERSION = 3
+HEADER = struct.Struct("<4sHxxIQQQQQ")
+
+
+def dumps(codes: List[Code]) -> bytes:
+    """Only blocks the parser can produce are written, so that everything dumped can be loaded back."""
+    counts = array('I')
+    title_lengths = array('I')
+    titles = bytearray()
+    blocks = array('I')
+    payload_lengths = array('I')
+    payloads = bytearray()
+    line_counts = array('I')
+    lines = array('I')
+    for code in codes:
+        counts.append(len(code.blocks))
+        title = code.title.encode('utf-8')
+        title_lengths.append(len(title))
+        titles += title
+        for block in code.blocks:
+            if Block.block_type(block._first) is not type(block):
+                raise Exception(f"Can't dump {type(block).__name__}: \"{block.first} {block.second}\"")
+            blocks.append(block._first)
+            blocks.append(block._second)
+            if type(block) == Patch:
+                payload = block.bytes
+                payload_lengths.append(len(payload))
+                payloads += payload
+        line_counts.append(len(code.line_numbers))
+        lines.extend(code.line_numbers)
+    if sys.byteorder != 'little':
+        for column in (counts, title_lengths, blocks, payload_lengths, line_counts, lines):
+            column.byteswap()
+    parts = [
+        HEADER.pack(MAGIC, VERSION, len(codes), len(blocks) // 2, len(payload_lengths), len(titles), len(payloads),
+                    len(lines)),
+        counts.tobytes(),
+        title_lengths.tobytes(),
+        _pad(titles),
+        blocks.tobytes(),
+        payload_lengths.tobytes(),
+        _pad(payloads),
+        line_counts.tobytes(),
+        lines.tobytes(),
+    ]
+    return b"".join(parts)
+
+
+def dump(codes: List[Code], file: BinaryIO):
+    file.write(dumps(codes))
+
+
+class Tables(NamedTuple):
+    counts: memoryview
+    title_lengths: memoryview
+    titles: memoryview
+    blocks: memoryview
+    payload_lengths: memoryview
+    payloads: memoryview
+    line_counts: memoryview
+    lines: memoryview
+
+
+def read_tables(data) -> Tables:
+    """Locate the sections of a dump without building any objects. Integer tables are native-order uint32 views."""
+    view = memoryview(data)
+    magic, version, code_count, block_count, patch_count, title_size, payload_size, line_count = \
+        HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise Exception("Not an ARTalk binary file.")
+    if version != VERSION:
+        raise Exception(f"Unsupported ARTalk binary version {version}, expected {VERSION}.")
+    position = HEADER.size
+    counts, position = _words(view, position, code_count)
+    title_lengths, position = _words(view, position, code_count)
+    titles = view[position:position + title_size]
+    position += _padded(title_size)
+    blocks, position = _words(view, position, 2 * block_count)
+    payload_lengths, position = _words(view, position, patch_count)
+    payloads = view[position:position + payload_size]
+    position += _padded(payload_size)
+    line_counts, position = _words(view, position, code_count)
+    lines, position = _words(view, position, line_count)
+    return Tables(counts, title_lengths, titles, blocks, payload_lengths, payloads, line_counts, lines)
+
+
+def loads(data) -> List[Code]:
+    """
+    Rebuild codes from a bytes-like object (bytes, mmap, ...). Integer tables are read in place where possible, and
+    blocks are built straight from their words, without going through text. The words are checked like parsed ones.
+    """
+    counts, title_lengths, titles, blocks, payload_lengths, payloads, line_counts, lines = read_tables(data)
+    words = blocks.tolist()
+    firsts = words[0::2]
+    seconds = words[1::2]
+    types = [Block.block_type(first) for first in firsts]
+    all_blocks = [None if block is None else block.parse_words(first, second)
+                  for block, first, second in zip(types, firsts, seconds)]
+    if None in all_blocks:
+        index = all_blocks.index(None)
+        raise Exception(f"No matching block pattern found: \"{firsts[index]:08X} {seconds[index]:08X}\"")
+    payload_offset = 0
+    for patch_index, block_index in enumerate(index for index, block in enumerate(types) if block is Patch):
+        payload_end = payload_offset + payload_lengths[patch_index]
+        all_blocks[block_index].bytes = bytearray(payloads[payload_offset:payload_end])
+        payload_offset = payload_end
+
+    codes = []
+    block_offset = 0
+    title_offset = 0
+    line_offset = 0
+    for code_index in range(len(counts)):
+        title_end = title_offset + title_lengths[code_index]
+        code = Code(title=str(titles[title_offset:title_end], 'utf-8'))
+        title_offset = title_end
+        block_end = block_offset + counts[code_index]
+        code.blocks = all_blocks[block_offset:block_end]
+        block_offset = block_end
+        line_end = line_offset + line_counts[code_index]
+        code.line_numbers = lines[line_offset:line_end].tolist()
+        line_offset = line_end
+        codes.append(code)
+    return codes
+
+
+def load(file: BinaryIO) -> List[Code]:
+    return loads(file.read())
+
+
+def _words(view: memoryview, position: int, count: int):
+    end = position + 4 * count
+    if sys.byteorder == 'little':
+        return view[position:end].cast('I'), end
+    words = array('I')
+    words.frombytes(view[position:end])
+    words.byteswap()
+    return words, end
+
+
+def _padded(size: int) -> int:
+    return (size + 3) & ~3
+
+
+def _pad(data: bytearray) -> bytes:
+    return bytes(data) + b"\0" * (_padded(len(data)) - len(data))
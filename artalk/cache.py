@@ -0,0 +1,112 @@
+import hashlib
+import os
+import tempfile
+from typing import List
+
+from artalk import binary, codeblocks
+from artalk.parser import Parser, Code
+
+
+def _format_version() -> bytes:
+    # Entries written by another binary format or another set of block definitions never match
+    with open(codeblocks.__file__, 'rb') as file:
+        source = file.read()
+    return f"{binary.VERSION}:".encode('ascii') + hashlib.sha256(source).digest()
+
+
+class ParseCache:
+    """
+    Parse results stored in a local directory, keyed by a hash of the input document. Entries are kept in the
+    artalk.binary format; the least recently used ones are evicted once the directory grows beyond max_size bytes.
+    """
+    SUFFIX = '.artk'
+    CHUNK = 1024 * 1024  # Bytes hashed at a time
+    FORMAT_VERSION = _format_version()
+
+    directory: str
+    max_size: int
+    parser: Parser
+    hits: int
+    misses: int
+
+    def __init__(self, directory: str, max_size: int = 256 * 1024 * 1024, parser: Parser = None):
+        self.directory = directory
+        self.max_size = max_size
+        self.parser = parser if parser is not None else Parser()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def parse(self, string: str) -> List[Code]:
+        key = self.key(string.encode('utf-8'))
+        codes = self._load(key)
+        if codes is None:
+            codes = self.parser.parse(string)
+            self._store(key, codes)
+        return codes
+
+    def parse_file(self, path: str) -> List[Code]:
+        """Like parse, but the file is hashed in chunks rather than read into memory before it is parsed."""
+        digest = hashlib.sha256(self.FORMAT_VERSION)
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(self.CHUNK), b""):
+                digest.update(chunk)
+        key = digest.hexdigest()
+        codes = self._load(key)
+        if codes is None:
+            codes = self.parser.parse_file(path)
+            self._store(key, codes)
+        return codes
+
+    @classmethod
+    def key(cls, data: bytes) -> str:
+        return hashlib.sha256(cls.FORMAT_VERSION + data).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(self.SUFFIX):
+                os.remove(os.path.join(self.directory, name))
+
+    def _load(self, key: str):
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as file:
+                codes = binary.load(file)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:  # Truncated or otherwise unreadable entry
+            self.misses += 1
+            os.remove(path)
+            return None
+        os.utime(path)  # Mark as recently used
+        self.hits += 1
+        return codes
+
+    def _store(self, key: str, codes: List[Code]):
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(descriptor, 'wb') as file:
+            binary.dump(codes, file)
+        os.replace(temporary, self.path(key))
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.SUFFIX):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:  # Evicted by another process sharing the directory
+                pass
+            total -= size
@@ -0,0 +1,151 @@
+import io
+from typing import Iterable, TextIO, Callable, Dict, List
+
+from artalk.codeblocks import Block, WWrite, SWrite, BWrite, Conditional16bitCodes, LoadOffset, SetOffset1, \
+    AddToOffset, Reset, AddToDxData, SetDxData, DxDataWordWrite, DxDataShortWrite, \
+    DxDataByteWrite, DxDataWordRead, DxDataShortRead, DxDataByteRead, Patch, Memory
+from artalk.flow import Node, LoopNode, ButtonNode
+from artalk.parser import Code
+
+PRELUDE = """#include <stdint.h>
+#include <string.h>
+
+#define U32(address) (*(volatile uint32_t*)(uintptr_t)(address))
+#define U16(address) (*(volatile uint16_t*)(uintptr_t)(address))
+#define U8(address) (*(volatile uint8_t*)(uintptr_t)(address))
+"""
+
+
+class CGenerator:
+    """
+    Writes codes as one C translation unit: a function per code taking the pressed buttons, with the offset and
+    DxData registers as locals, conditionals and button checks as if blocks, C0/D1 as for loops and patches as
+    static arrays copied with memcpy. Everything goes through the single output stream.
+    """
+    INDENT = "    "
+
+    output: TextIO
+    comments: bool
+
+    def __init__(self, output: TextIO = None, comments: bool = False):
+        """With comments, every statement is followed by the words of the block it came from."""
+        self.output = output if output is not None else io.StringIO()
+        self.comments = comments
+        self.functions = []
+        self._patches = 0
+        self._patch_names = iter(())
+        self._statements: Dict[type, Callable[[Block], str]] = {
+            WWrite: lambda block: f"U32({self._address(block)}) = {block.value:#010x};",
+            SWrite: lambda block: f"U16({self._address(block)}) = {block.value:#06x};",
+            BWrite: lambda block: f"U8({self._address(block)}) = {block.value:#04x};",
+            LoadOffset: lambda block: f"offset = U32({self._address(block)});",
+            SetOffset1: lambda block: f"offset = {block.value:#010x};",
+            AddToOffset: lambda block: f"offset += {block.value:#010x};",
+            Reset: lambda block: "offset = 0; dxdata = 0;",
+            AddToDxData: lambda block: f"dxdata += {block.value:#010x};",
+            SetDxData: lambda block: f"dxdata = {block.value:#010x};",
+            DxDataWordWrite: lambda block: f"dxdata = U32({self._address(block)});",
+            DxDataShortWrite: lambda block: f"dxdata = U16({self._address(block)});",
+            DxDataByteWrite: lambda block: f"dxdata = U8({self._address(block)});",
+            DxDataWordRead: lambda block: f"U32({self._address(block)}) = dxdata; offset += 4;",
+            DxDataShortRead: lambda block: f"U16({self._address(block)}) = (uint16_t)dxdata; offset += 2;",
+            DxDataByteRead: lambda block: f"U8({self._address(block)}) = (uint8_t)dxdata; offset += 1;",
+            Memory: lambda block: f"memcpy((void*)(uintptr_t){block.address:#010x}, (const void*)(uintptr_t)offset, "
+                                  f"{block.value});",
+        }
+        self.output.write(PRELUDE)
+
+    def program(self, codes: Iterable[Code], entry: str = "run_codes") -> TextIO:
+        """Write all codes followed by an entry function that runs them in order."""
+        for code in codes:
+            self.code(code)
+        self.output.write(f"\nvoid {entry}(uint32_t buttons)\n{{\n")
+        for function in self.functions:
+            self.output.write(f"{self.INDENT}{function}(buttons);\n")
+        self.output.write("}\n")
+        return self.output
+
+    def code(self, code: Code) -> str:
+        """Write one code as a function and return the function's name."""
+        name = f"code_{len(self.functions)}"
+        root = code.flow()
+        self._patch_names = iter(self._write_patches(root))
+        self.output.write(f"\n/* {_comment(code.title)} */\nvoid {name}(uint32_t buttons)\n{{\n")
+        self.output.write(f"{self.INDENT}uint32_t offset = 0;\n{self.INDENT}uint32_t dxdata = 0;\n")
+        self.output.write(f"{self.INDENT}(void)buttons; (void)dxdata;\n")
+        self._write_children(root, 1)
+        self.output.write("}\n")
+        self.functions.append(name)
+        return name
+
+    def _write_patches(self, root: Node) -> List[str]:
+        # The payloads of a code go right before its function, in the order the statements will use them
+        names = []
+        for block in root.walk():
+            if type(block) == Patch:
+                name = f"patch_{self._patches}"
+                data = str.join(", ", [f"0x{byte:02X}" for byte in block.bytes]) or "0"
+                self.output.write(f"\nstatic const uint8_t {name}[] = {{{data}}};\n")
+                self._patches += 1
+                names.append(name)
+        return names
+
+    def _write_children(self, node: Node, depth: int):
+        indent = self.INDENT * depth
+        for child in node.children:
+            if isinstance(child, Node):
+                self._write_node(child, depth)
+            else:
+                self._write_statement(child, indent)
+
+    def _write_node(self, node: Node, depth: int):
+        indent = self.INDENT * depth
+        block = node.block
+        if type(node) == LoopNode:
+            counter = f"i{depth}"
+            head = f"for (uint32_t {counter} = 0; {counter} < {block.value:#010x}; {counter}++) {{"
+        elif type(node) == ButtonNode:
+            head = f"if ((buttons & {block.value:#06x}) == {block.value:#06x}) {{"
+        else:
+            head = f"if ({self._condition(block)}) {{"
+        self.output.write(f"{indent}{head}{self._source(block)}\n")
+        self._write_children(node, depth + 1)
+        if type(node) == LoopNode and node.end is not None:
+            self.output.write(f"{indent}{self.INDENT}offset += {node.end.value:#010x};{self._source(node.end)}\n")
+        self.output.write(f"{indent}}}\n")
+
+    def _write_statement(self, block: Block, indent: str):
+        if type(block) == Patch:
+            statement = f"memcpy((void*)(uintptr_t)({self._address(block)}), {next(self._patch_names)}, " \
+                        f"{len(block.bytes)});"
+        else:
+            statement = self._statements.get(type(block))
+            if statement is None:
+                raise Exception(f"No C translation for {type(block).__name__}: \"{block.first} {block.second}\"")
+            statement = statement(block)
+        self.output.write(f"{indent}{statement}{self._source(block)}\n")
+
+    @staticmethod
+    def _condition(block: Block) -> str:
+        operator = block.condition.value
+        if isinstance(block, Conditional16bitCodes):
+            return f"{block.value:#06x} {operator} (U16({CGenerator._address(block)}) & ~{block.mask:#06x})"
+        return f"{block.value:#010x} {operator} U32({CGenerator._address(block)})"
+
+    @staticmethod
+    def _address(block: Block) -> str:
+        return f"{block.address:#010x} + offset"
+
+    def _source(self, block: Block) -> str:
+        return f" /* {block.first} {block.second} */" if self.comments else ""
+
+
+def generate(codes: Iterable[Code], comments: bool = False, output: TextIO = None) -> str:
+    """The C translation unit for the given codes as a string, or written to output (returning "")."""
+    generator = CGenerator(output, comments)
+    generator.program(codes)
+    return generator.output.getvalue() if output is None else ""
+
+
+def _comment(text: str) -> str:
+    return text.replace("*/", "* /")
@@ -1,26 +1,68 @@
 import enum
 from abc import ABC
-from typing import Optional, List
+from array import array
+from itertools import islice
+from typing import Optional, List, Dict, Iterator
 
 # https://web.archive.org/web/20170218053432/http://doc.kodewerx.org/hacking_nds.html
 # https://github.com/JourneyOver/CTRPF-AR-CHEAT-CODES/blob/master/ActionReplayCodeTypes.txt
 
 DXDATA_LABEL = 'DxDATA'
+DXDATA_C_LABEL = 'dxdata'
 
 
 class Block:
-    first: str
-    second: str
+    # Both words are kept as ints; the hex strings are only formatted on access
+    __slots__ = ('_first', '_second')
     FIRST_REGEX: str
     SECOND_REGEX: str
+    OPCODE: str
+    OPCODES: Dict[str, type] = {}
+    NIBBLES: Dict[int, type] = {}  # OPCODES by int key: first nibble, or whole first word for the D family
+    D_WORDS: Dict[int, type] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        # Concrete blocks declare their opcode: the first nibble, or the whole first word for the D family
+        super(Block, cls).__init_subclass__(**kwargs)
+        opcode = cls.__dict__.get('OPCODE')
+        if opcode is not None:
+            Block.OPCODES[opcode] = cls
+            (Block.NIBBLES if len(opcode) == 1 else Block.D_WORDS)[int(opcode, 16)] = cls
 
     def __init__(self, first: str = None, second: str = None):
         if first is not None and second is not None:
-            self.first = first
-            self.second = second
+            self._first = int(first, 16)
+            self._second = int(second, 16)
+
+    @property
+    def first(self) -> str:
+        return f"{self._first:08X}"
+
+    @property
+    def second(self) -> str:
+        return f"{self._second:08X}"
+
+    @classmethod
+    def from_words(cls, first: int, second: int) -> 'Block':
+        """Trusted construction from both words, skipping the range checks. Used for already validated input."""
+        block = cls.__new__(cls)
+        block._first = first
+        block._second = second
+        return block
+
+    @staticmethod
+    def block_type(first: int) -> Optional[type]:
+        """The block class registered for a first word, if any."""
+        if first >> 28 == 0xD:
+            return Block.D_WORDS.get(first)
+        return Block.NIBBLES.get(first >> 28)
 
     @classmethod
     def parse(cls, first: str, second: str) -> Optional[object]:
+        return cls.parse_words(int(first, 16), int(second, 16))
+
+    @classmethod
+    def parse_words(cls, first: int, second: int) -> Optional[object]:
         pass
 
     def to_human_readable(self, comments=False):
@@ -37,12 +79,17 @@ class Block:
 
 
 class Offset:
+    __slots__ = ()
     OFFSET_LABEL = 'offset'
 
 
 class Address(Offset):
+    __slots__ = ()
     ADDRESS_FORMAT = '#010X'
-    address: int
+
+    @property
+    def address(self) -> int:
+        return self._first & 0x0FFFFFFF
 
     def hex_address(self, offset=False) -> str:
         return '0x' + f"{self.address:{self.ADDRESS_FORMAT}}"[2:] + (f" + {self.OFFSET_LABEL}" if offset else "")
@@ -60,9 +107,13 @@ class OutOfRangeError(BaseException):
 
 
 class Value:
+    __slots__ = ()
     VALUE_FORMAT: str
     VALUE_NAME: str
-    value: int
+
+    @property
+    def value(self) -> int:
+        return self._second
 
     def hex_value(self, decimal=False, c_style=False) -> str:
         suffix = ""
@@ -75,23 +126,30 @@ class Value:
 
 
 class Word(Value):
+    __slots__ = ()
     VALUE_FORMAT = '08X'
     VALUE_NAME = 'word'
 
 
 class Short(Value):
+    __slots__ = ()
     VALUE_FORMAT = '04X'
     VALUE_NAME = 'short'
 
 
 class Byte(Value):
+    __slots__ = ()
     VALUE_FORMAT = '02X'
     VALUE_NAME = 'byte'
 
 
 class Mask:
+    __slots__ = ()
     MASK_FORMAT = '04X'
-    mask: int
+
+    @property
+    def mask(self) -> int:
+        return self._second >> 16
 
     def hex_mask(self, decimal=False, c_style=False) -> str:
         suffix = ""
@@ -104,13 +162,11 @@ class Mask:
 
 
 class MemoryWrite(Value, Address, Block, ABC):
+    __slots__ = ()
+
     def __init__(self, value: int = None, address: int = None):
         if value is not None and address is not None:
-            self.value = value
-            self.address = address
-            self._set_blocks()
-            super(MemoryWrite, self).__init__(self.first, self.second)
-        super(MemoryWrite, self).__init__()
+            self._set_blocks(value, address)
 
     @classmethod
     def create(cls, value: int, address: int) -> Block:
@@ -128,57 +184,60 @@ class MemoryWrite(Value, Address, Block, ABC):
 
 
 class WWrite(MemoryWrite, Word):
+    __slots__ = ()
+    OPCODE = "0"
+
     @classmethod
-    def parse(cls, first: str, second: str) -> Optional[Block]:
-        if first[0] == "0":
-            address = int(first[1:], 16)
-            value = int(second, 16)
-            return WWrite(value, address)
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first >> 28 == 0x0:
+            return WWrite.from_words(first, second)
         return None
 
-    def _set_blocks(self):
-        if self.value < 0 or self.value > 0xFFFFFFFF:
-            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, self.value)
-        if self.address < 0 or self.address > 0xFFFFFFF:
-            raise OutOfRangeError("Address", 0, 0xFFFFFFF, self.address)
-        self.first = f"0{self.address:07X}"
-        self.second = f"{self.value:08X}"
+    def _set_blocks(self, value: int, address: int):
+        if value < 0 or value > 0xFFFFFFFF:
+            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, value)
+        if address < 0 or address > 0xFFFFFFF:
+            raise OutOfRangeError("Address", 0, 0xFFFFFFF, address)
+        self._first = address
+        self._second = value
 
 
 class SWrite(MemoryWrite, Short):
+    __slots__ = ()
+    OPCODE = "1"
+
     @classmethod
-    def parse(cls, first: str, second: str) -> Optional[Block]:
-        if first[0] == "1" and second[:4] == "0000":
-            address = int(first[1:], 16)
-            value = int(second, 16)
-            return SWrite(value, address)
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first >> 28 == 0x1 and second >> 16 == 0:
+            return SWrite.from_words(first, second)
         return None
 
-    def _set_blocks(self):
-        if self.value < 0 or self.value > 0xFFFF:
-            raise OutOfRangeError("Value", 0, 0xFFFF, self.value)
-        if self.address < 0 or self.address > 0xFFFFFFF:
-            raise OutOfRangeError("Address", 0, 0xFFFFFFF, self.address)
-        self.first = f"1{self.address:07X}"
-        self.second = f"{self.value:08X}"
+    def _set_blocks(self, value: int, address: int):
+        if value < 0 or value > 0xFFFF:
+            raise OutOfRangeError("Value", 0, 0xFFFF, value)
+        if address < 0 or address > 0xFFFFFFF:
+            raise OutOfRangeError("Address", 0, 0xFFFFFFF, address)
+        self._first = 0x10000000 | address
+        self._second = value
 
 
 class BWrite(MemoryWrite, Byte):
+    __slots__ = ()
+    OPCODE = "2"
+
     @classmethod
-    def parse(cls, first: str, second: str) -> Optional[Block]:
-        if first[0] == "2" and second[:6] == "000000":
-            address = int(first[1:], 16)
-            value = int(second, 16)
-            return BWrite(value, address)
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first >> 28 == 0x2 and second >> 8 == 0:
+            return BWrite.from_words(first, second)
         return None
 
-    def _set_blocks(self):
-        if self.value < 0 or self.value > 0xFF:
-            raise OutOfRangeError("Value", 0, 0xFF, self.value)
-        if self.address < 0 or self.address > 0xFFFFFFF:
-            raise OutOfRangeError("Address", 0, 0xFFFFFFF, self.address)
-        self.first = f"2{self.address:07X}"
-        self.second = f"{self.value:08X}"
+    def _set_blocks(self, value: int, address: int):
+        if value < 0 or value > 0xFF:
+            raise OutOfRangeError("Value", 0, 0xFF, value)
+        if address < 0 or address > 0xFFFFFFF:
+            raise OutOfRangeError("Address", 0, 0xFFFFFFF, address)
+        self._first = 0x20000000 | address
+        self._second = value
 
 
 class Conditions(enum.Enum):
@@ -189,15 +248,12 @@ class Conditions(enum.Enum):
 
 
 class Conditional32bitCodes(Word, Address, Block, ABC):
+    __slots__ = ()
     condition: Conditions
 
     def __init__(self, value: int = None, address: int = None):
         if value is not None and address is not None:
-            self.value = value
-            self.address = address
-            self._set_blocks()
-            super(Conditional32bitCodes, self).__init__(self.first, self.second)
-        super(Conditional32bitCodes, self).__init__()
+            self._set_blocks(value, address)
 
     @classmethod
     def create(cls, value: int, condition: Conditions, address: int) -> Block:
@@ -221,99 +277,96 @@ class Conditional32bitCodes(Word, Address, Block, ABC):
 
 
 class WGreaterThan(Conditional32bitCodes):
+    __slots__ = ()
     condition = Conditions.GREATERTHAN
+    OPCODE = "3"
 
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if first[0] == "3":
-            address = int(first[1:], 16)
-            value = int(second, 16)
-            return WGreaterThan(value, address)
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first >> 28 == 0x3:
+            return WGreaterThan.from_words(first, second)
         return None
 
-    def _set_blocks(self):
-        if self.value < 0 or self.value > 0xFFFFFFFF:
-            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, self.value)
-        if self.address < 0 or self.address > 0xFFFFFFF:
-            raise OutOfRangeError("Address", 0, 0xFFFFFFF, self.address)
-        self.first = f"3{self.address:07X}"
-        self.second = f"{self.value:08X}"
+    def _set_blocks(self, value: int, address: int):
+        if value < 0 or value > 0xFFFFFFFF:
+            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, value)
+        if address < 0 or address > 0xFFFFFFF:
+            raise OutOfRangeError("Address", 0, 0xFFFFFFF, address)
+        self._first = 0x30000000 | address
+        self._second = value
 
 
 class WLessThan(Conditional32bitCodes):
+    __slots__ = ()
     condition = Conditions.LESSTHAN
+    OPCODE = "4"
 
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if first[0] == "4":
-            address = int(first[1:], 16)
-            value = int(second, 16)
-            return WLessThan(value, address)
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first >> 28 == 0x4:
+            return WLessThan.from_words(first, second)
         return None
 
-    def _set_blocks(self):
-        if self.value < 0 or self.value > 0xFFFFFFFF:
-            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, self.value)
-        if self.address < 0 or self.address > 0xFFFFFFF:
-            raise OutOfRangeError("Address", 0, 0xFFFFFFF, self.address)
-        self.first = f"4{self.address:07X}"
-        self.second = f"{self.value:08X}"
-        return None
+    def _set_blocks(self, value: int, address: int):
+        if value < 0 or value > 0xFFFFFFFF:
+            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, value)
+        if address < 0 or address > 0xFFFFFFF:
+            raise OutOfRangeError("Address", 0, 0xFFFFFFF, address)
+        self._first = 0x40000000 | address
+        self._second = value
 
 
 class WEqualTo(Conditional32bitCodes):
+    __slots__ = ()
     condition = Conditions.EQUALTO
+    OPCODE = "5"
 
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if first[0] == "5":
-            address = int(first[1:], 16)
-            value = int(second, 16)
-            return WEqualTo(value, address)
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first >> 28 == 0x5:
+            return WEqualTo.from_words(first, second)
         return None
 
-    def _set_blocks(self):
-        if self.value < 0 or self.value > 0xFFFFFFFF:
-            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, self.value)
-        if self.address < 0 or self.address > 0xFFFFFFF:
-            raise OutOfRangeError("Address", 0, 0xFFFFFFF, self.address)
-        self.first = f"5{self.address:07X}"
-        self.second = f"{self.value:08X}"
-        return None
+    def _set_blocks(self, value: int, address: int):
+        if value < 0 or value > 0xFFFFFFFF:
+            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, value)
+        if address < 0 or address > 0xFFFFFFF:
+            raise OutOfRangeError("Address", 0, 0xFFFFFFF, address)
+        self._first = 0x50000000 | address
+        self._second = value
 
 
 class WNotEqualTo(Conditional32bitCodes):
+    __slots__ = ()
     condition = Conditions.NOTEQUALTO
+    OPCODE = "6"
 
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if first[0] == "6":
-            address = int(first[1:], 16)
-            value = int(second, 16)
-            return WNotEqualTo(value, address)
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first >> 28 == 0x6:
+            return WNotEqualTo.from_words(first, second)
         return None
 
-    def _set_blocks(self):
-        if self.value < 0 or self.value > 0xFFFFFFFF:
-            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, self.value)
-        if self.address < 0 or self.address > 0xFFFFFFF:
-            raise OutOfRangeError("Address", 0, 0xFFFFFFF, self.address)
-        self.first = f"6{self.address:07X}"
-        self.second = f"{self.value:08X}"
-        return None
+    def _set_blocks(self, value: int, address: int):
+        if value < 0 or value > 0xFFFFFFFF:
+            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, value)
+        if address < 0 or address > 0xFFFFFFF:
+            raise OutOfRangeError("Address", 0, 0xFFFFFFF, address)
+        self._first = 0x60000000 | address
+        self._second = value
 
 
 class Conditional16bitCodes(Short, Mask, Address, Block, ABC):
+    __slots__ = ()
     condition: Conditions
 
+    @property
+    def value(self) -> int:
+        return self._second & 0xFFFF
+
     def __init__(self, value: int = None, address: int = None, mask: int = None):
         if value is not None and address is not None and mask is not None:
-            self.value = value
-            self.address = address
-            self.mask = mask
-            self._set_blocks()
-            super(Conditional16bitCodes, self).__init__(self.first, self.second)
-        super(Conditional16bitCodes, self).__init__()
+            self._set_blocks(value, address, mask)
 
     @classmethod
     def create(cls, value: int, condition: Conditions, address: int, mask: int) -> Block:
@@ -337,122 +390,112 @@ class Conditional16bitCodes(Short, Mask, Address, Block, ABC):
 
 
 class SGreaterThan(Conditional16bitCodes):
+    __slots__ = ()
     condition = Conditions.GREATERTHAN
+    OPCODE = "7"
 
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if first[0] == "7":
-            address = int(first[1:], 16)
-            value = int(second[4:], 16)
-            mask = int(second[:4], 16)
-            return SGreaterThan(value, address, mask)
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first >> 28 == 0x7:
+            return SGreaterThan.from_words(first, second)
         return None
 
-    def _set_blocks(self):
-        if self.value < 0 or self.value > 0xFFFF:
-            raise OutOfRangeError("Value", 0, 0xFFFF, self.value)
-        if self.mask < 0 or self.mask > 0xFFFF:
-            raise OutOfRangeError("Mask", 0, 0xFFFF, self.mask)
-        if self.address < 0 or self.address > 0xFFFFFFF:
-            raise OutOfRangeError("Address", 0, 0xFFFFFFF, self.address)
-        self.first = f"7{self.address:07X}"
-        self.second = f"{self.mask:04X}{self.value:04X}"
-        return None
+    def _set_blocks(self, value: int, address: int, mask: int):
+        if value < 0 or value > 0xFFFF:
+            raise OutOfRangeError("Value", 0, 0xFFFF, value)
+        if mask < 0 or mask > 0xFFFF:
+            raise OutOfRangeError("Mask", 0, 0xFFFF, mask)
+        if address < 0 or address > 0xFFFFFFF:
+            raise OutOfRangeError("Address", 0, 0xFFFFFFF, address)
+        self._first = 0x70000000 | address
+        self._second = mask << 16 | value
 
 
 class SLessThan(Conditional16bitCodes):
+    __slots__ = ()
     condition = Conditions.LESSTHAN
+    OPCODE = "8"
 
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if first[0] == "8":
-            address = int(first[1:], 16)
-            value = int(second[4:], 16)
-            mask = int(second[:4], 16)
-            return SLessThan(value, address, mask)
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first >> 28 == 0x8:
+            return SLessThan.from_words(first, second)
         return None
 
-    def _set_blocks(self):
-        if self.value < 0 or self.value > 0xFFFF:
-            raise OutOfRangeError("Value", 0, 0xFFFF, self.value)
-        if self.mask < 0 or self.mask > 0xFFFF:
-            raise OutOfRangeError("Mask", 0, 0xFFFF, self.mask)
-        if self.address < 0 or self.address > 0xFFFFFFF:
-            raise OutOfRangeError("Address", 0, 0xFFFFFFF, self.address)
-        self.first = f"8{self.address:07X}"
-        self.second = f"{self.mask:04X}{self.value:04X}"
-        return None
+    def _set_blocks(self, value: int, address: int, mask: int):
+        if value < 0 or value > 0xFFFF:
+            raise OutOfRangeError("Value", 0, 0xFFFF, value)
+        if mask < 0 or mask > 0xFFFF:
+            raise OutOfRangeError("Mask", 0, 0xFFFF, mask)
+        if address < 0 or address > 0xFFFFFFF:
+            raise OutOfRangeError("Address", 0, 0xFFFFFFF, address)
+        self._first = 0x80000000 | address
+        self._second = mask << 16 | value
 
 
 class SEqualTo(Conditional16bitCodes):
+    __slots__ = ()
     condition = Conditions.EQUALTO
+    OPCODE = "9"
 
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if first[0] == "9":
-            address = int(first[1:], 16)
-            value = int(second[4:], 16)
-            mask = int(second[:4], 16)
-            return SEqualTo(value, address, mask)
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first >> 28 == 0x9:
+            return SEqualTo.from_words(first, second)
         return None
 
-    def _set_blocks(self):
-        if self.value < 0 or self.value > 0xFFFF:
-            raise OutOfRangeError("Value", 0, 0xFFFF, self.value)
-        if self.mask < 0 or self.mask > 0xFFFF:
-            raise OutOfRangeError("Mask", 0, 0xFFFF, self.mask)
-        if self.address < 0 or self.address > 0xFFFFFFF:
-            raise OutOfRangeError("Address", 0, 0xFFFFFFF, self.address)
-        self.first = f"9{self.address:07X}"
-        self.second = f"{self.mask:04X}{self.value:04X}"
-        return None
+    def _set_blocks(self, value: int, address: int, mask: int):
+        if value < 0 or value > 0xFFFF:
+            raise OutOfRangeError("Value", 0, 0xFFFF, value)
+        if mask < 0 or mask > 0xFFFF:
+            raise OutOfRangeError("Mask", 0, 0xFFFF, mask)
+        if address < 0 or address > 0xFFFFFFF:
+            raise OutOfRangeError("Address", 0, 0xFFFFFFF, address)
+        self._first = 0x90000000 | address
+        self._second = mask << 16 | value
 
 
 class SNotEqualTo(Conditional16bitCodes):
+    __slots__ = ()
     condition = Conditions.NOTEQUALTO
+    OPCODE = "A"
 
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if first[0] == "A":
-            address = int(first[1:], 16)
-            value = int(second[4:], 16)
-            mask = int(second[:4], 16)
-            return SNotEqualTo(value, address, mask)
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first >> 28 == 0xA:
+            return SNotEqualTo.from_words(first, second)
         return None
 
-    def _set_blocks(self):
-        if self.value < 0 or self.value > 0xFFFF:
-            raise OutOfRangeError("Value", 0, 0xFFFF, self.value)
-        if self.mask < 0 or self.mask > 0xFFFF:
-            raise OutOfRangeError("Mask", 0, 0xFFFF, self.mask)
-        if self.address < 0 or self.address > 0xFFFFFFF:
-            raise OutOfRangeError("Address", 0, 0xFFFFFFF, self.address)
-        self.first = f"A{self.address:07X}"
-        self.second = f"{self.mask:04X}{self.value:04X}"
-        return None
+    def _set_blocks(self, value: int, address: int, mask: int):
+        if value < 0 or value > 0xFFFF:
+            raise OutOfRangeError("Value", 0, 0xFFFF, value)
+        if mask < 0 or mask > 0xFFFF:
+            raise OutOfRangeError("Mask", 0, 0xFFFF, mask)
+        if address < 0 or address > 0xFFFFFFF:
+            raise OutOfRangeError("Address", 0, 0xFFFFFFF, address)
+        self._first = 0xA0000000 | address
+        self._second = mask << 16 | value
 
 
 class LoadOffset(Address, Block):
+    __slots__ = ()
+    OPCODE = "B"
+
     def __init__(self, address: int = None):
         if address is not None:
-            self.address = address
-            self._set_blocks()
-            super(LoadOffset, self).__init__(self.first, self.second)
-        super(LoadOffset, self).__init__()
+            self._set_blocks(address)
 
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if first[0] == "B" and second == "00000000":
-            address = int(first[1:], 16)
-            return LoadOffset(address)
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first >> 28 == 0xB and second == 0:
+            return LoadOffset.from_words(first, second)
         return None
 
-    def _set_blocks(self):
-        if self.address < 0 or self.address > 0xFFFFFFF:
-            raise OutOfRangeError("Address", 0, 0xFFFFFFF, self.address)
-        self.first = f"B{self.address:07X}"
-        self.second = '00000000'
-        return None
+    def _set_blocks(self, address: int):
+        if address < 0 or address > 0xFFFFFFF:
+            raise OutOfRangeError("Address", 0, 0xFFFFFFF, address)
+        self._first = 0xB0000000 | address
+        self._second = 0x00000000
 
     def to_human_readable(self, comments=False):
         return f"Load offset from [{self.hex_address(True)}]"
@@ -462,26 +505,24 @@ class LoadOffset(Address, Block):
 
 
 class SetOffset1(Word, Offset, Block):
+    __slots__ = ()
+    OPCODE = "D3000000"
+
     def __init__(self, value: int = None):
         if value is not None:
-            self.value = value
-            self._set_blocks()
-            super(SetOffset1, self).__init__(self.first, self.second)
-        super(SetOffset1, self).__init__()
+            self._set_blocks(value)
 
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if first == "D3000000":
-            value = int(second, 16)
-            return SetOffset1(value)
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first == 0xD3000000:
+            return SetOffset1.from_words(first, second)
         return None
 
-    def _set_blocks(self):
-        if self.value < 0 or self.value > 0xFFFFFFFF:
-            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, self.value)
-        self.first = "D3000000"
-        self.second = f"{self.value:08X}"
-        return None
+    def _set_blocks(self, value: int):
+        if value < 0 or value > 0xFFFFFFFF:
+            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, value)
+        self._first = 0xD3000000
+        self._second = value
 
     def to_human_readable(self, comments=False):
         return f"Set offset to {self.hex_value(comments)}"
@@ -491,26 +532,23 @@ class SetOffset1(Word, Offset, Block):
 
 
 class SetOffset2(Word, Offset, Block):
+    __slots__ = ()
+
     def __init__(self, value: int = None):
         if value is not None:
-            self.value = value
-            self._set_blocks()
-            super(SetOffset2, self).__init__(self.first, self.second)
-        super(SetOffset2, self).__init__()
+            self._set_blocks(value)
 
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if first == "D3000001":
-            value = int(second, 16)
-            return SetOffset2(value)
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first == 0xD3000001:
+            return SetOffset2.from_words(first, second)
         return None
 
-    def _set_blocks(self):
-        if self.value < 0 or self.value > 0xFFFFFFFF:
-            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, self.value)
-        self.first = "D3000001"
-        self.second = f"{self.value:08X}"
-        return None
+    def _set_blocks(self, value: int):
+        if value < 0 or value > 0xFFFFFFFF:
+            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, value)
+        self._first = 0xD3000001
+        self._second = value
 
     def to_human_readable(self, comments=False):
         return f"Set offset2 to {self.hex_value(comments)}"
@@ -520,26 +558,24 @@ class SetOffset2(Word, Offset, Block):
 
 
 class AddToOffset(Word, Offset, Block):
+    __slots__ = ()
+    OPCODE = "DC000000"
+
     def __init__(self, value: int = None):
         if value is not None:
-            self.value = value
-            self._set_blocks()
-            super(AddToOffset, self).__init__(self.first, self.second)
-        super(AddToOffset, self).__init__()
+            self._set_blocks(value)
 
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if first == "DC000000":
-            value = int(second, 16)
-            return AddToOffset(value)
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first == 0xDC000000:
+            return AddToOffset.from_words(first, second)
         return None
 
-    def _set_blocks(self):
-        if self.value < 0 or self.value > 0xFFFFFFFF:
-            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, self.value)
-        self.first = "DC000000"
-        self.second = f"{self.value:08X}"
-        return None
+    def _set_blocks(self, value: int):
+        if value < 0 or value > 0xFFFFFFFF:
+            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, value)
+        self._first = 0xDC000000
+        self._second = value
 
     def to_human_readable(self, comments=False):
         return f"Add {self.hex_value(comments)} to offset"
@@ -549,241 +585,523 @@ class AddToOffset(Word, Offset, Block):
 
 
 class Repeat(Word, Block):
+    __slots__ = ()
+    OPCODE = "C"
+
+    def __init__(self, value: int = None):
+        if value is not None:
+            self._set_blocks(value)
+
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if cls.first == "C0000000":
-            cls.value = int(cls.second, 16)
-            return cls
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first == 0xC0000000:
+            return Repeat.from_words(first, second)
         return None
 
+    def _set_blocks(self, value: int):
+        if value < 0 or value > 0xFFFFFFFF:
+            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, value)
+        self._first = 0xC0000000
+        self._second = value
+
+    def to_human_readable(self, comments=False):
+        return f"for 0..{self.hex_value(comments)}:"
+
+    def to_c(self, comments=False):
+        return f"for (int i = 0; i < {self.hex_value(comments, True)}; i++) {{"
+
     def __str__(self):
-        return f"for 0..{self.hex_value(True)}:"
+        return self.to_human_readable(True)
 
 
 class ConditionEnd(Block):
+    __slots__ = ()
+    OPCODE = "D0000000"
+
+    def __init__(self):
+        self._set_blocks()
+
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if cls.first == "D0000000" and cls.second == "00000000":
-            return cls
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first == 0xD0000000 and second == 0:
+            return ConditionEnd.from_words(first, second)
         return None
 
-    def __str__(self):
+    def _set_blocks(self):
+        self._first = 0xD0000000
+        self._second = 0x00000000
+
+    def to_human_readable(self, comments=False):
         return "fi"
 
+    def to_c(self, comments=False):
+        return "}"
+
+    def __str__(self):
+        return self.to_human_readable(True)
+
 
 class RepetitionEnd(Word, Offset, Block):
+    __slots__ = ()
+    OPCODE = "D1000000"
+
+    def __init__(self, value: int = None):
+        if value is not None:
+            self._set_blocks(value)
+
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if cls.first == "D1000000":
-            cls.value = int(cls.second, 16)
-            return cls
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first == 0xD1000000:
+            return RepetitionEnd.from_words(first, second)
         return None
 
+    def _set_blocks(self, value: int):
+        if value < 0 or value > 0xFFFFFFFF:
+            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, value)
+        self._first = 0xD1000000
+        self._second = value
+
+    def to_human_readable(self, comments=False):
+        return f"Done; {self.OFFSET_LABEL} += {self.hex_value(comments)}"
+
+    def to_c(self, comments=False):
+        return f"{self.OFFSET_LABEL} += {self.hex_value(comments, True)}; }}"
+
     def __str__(self):
-        return f"Done; {self.OFFSET_LABEL} += {self.hex_value(True)}"
+        return self.to_human_readable(True)
 
 
 class Reset(Block):
+    __slots__ = ()
+    OPCODE = "D2000000"
+
+    def __init__(self):
+        self._set_blocks()
+
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if cls.first == "D2000000" and cls.second == "00000000":
-            return cls
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first == 0xD2000000 and second == 0:
+            return Reset.from_words(first, second)
         return None
 
-    def __str__(self):
+    def _set_blocks(self):
+        self._first = 0xD2000000
+        self._second = 0x00000000
+
+    def to_human_readable(self, comments=False):
         return "Reset"
 
+    def to_c(self, comments=False):
+        return f"{Offset.OFFSET_LABEL} = 0; {DXDATA_C_LABEL} = 0;"
+
+    def __str__(self):
+        return self.to_human_readable(True)
+
 
 class AddToDxData(Word, Block):
+    __slots__ = ()
+    OPCODE = "D4000000"
+
+    def __init__(self, value: int = None):
+        if value is not None:
+            self._set_blocks(value)
+
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if cls.first == "D4000000":
-            cls.value = int(cls.second, 16)
-            return cls
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first == 0xD4000000:
+            return AddToDxData.from_words(first, second)
         return None
 
+    def _set_blocks(self, value: int):
+        if value < 0 or value > 0xFFFFFFFF:
+            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, value)
+        self._first = 0xD4000000
+        self._second = value
+
+    def to_human_readable(self, comments=False):
+        return f"*{DXDATA_LABEL} += {self.hex_value(comments)}"
+
+    def to_c(self, comments=False):
+        return f"{DXDATA_C_LABEL} += {self.hex_value(comments, True)};"
+
     def __str__(self):
-        return f"*{DXDATA_LABEL} += {self.hex_value(True)}"
+        return self.to_human_readable(True)
 
 
 class SetDxData(Word, Block):
+    __slots__ = ()
+    OPCODE = "D5000000"
+
+    def __init__(self, value: int = None):
+        if value is not None:
+            self._set_blocks(value)
+
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if cls.first == "D5000000":
-            cls.value = int(cls.second, 16)
-            return cls
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first == 0xD5000000:
+            return SetDxData.from_words(first, second)
         return None
 
+    def _set_blocks(self, value: int):
+        if value < 0 or value > 0xFFFFFFFF:
+            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, value)
+        self._first = 0xD5000000
+        self._second = value
+
+    def to_human_readable(self, comments=False):
+        return f"*{DXDATA_LABEL} = {self.hex_value(comments)}"
+
+    def to_c(self, comments=False):
+        return f"{DXDATA_C_LABEL} = {self.hex_value(comments, True)};"
+
     def __str__(self):
-        return f"*{DXDATA_LABEL} = {self.hex_value(True)}"
+        return self.to_human_readable(True)
+
+
+class DxDataAddress(Address):
+    __slots__ = ()
+
+    @property
+    def address(self) -> int:
+        return self._second
+
 
+class DxDataWordWrite(DxDataAddress, Block):
+    __slots__ = ()
+    OPCODE = "D6000000"
+
+    def __init__(self, address: int = None):
+        if address is not None:
+            self._set_blocks(address)
 
-class DxDataWordWrite(Address, Block):
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if cls.first == "D6000000":
-            cls.address = int(cls.second, 16)
-            return cls
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first == 0xD6000000:
+            return DxDataWordWrite.from_words(first, second)
         return None
 
-    def __str__(self):
+    def _set_blocks(self, address: int):
+        if address < 0 or address > 0xFFFFFFFF:
+            raise OutOfRangeError("Address", 0, 0xFFFFFFFF, address)
+        self._first = 0xD6000000
+        self._second = address
+
+    def to_human_readable(self, comments=False):
         return f"*{DXDATA_LABEL} = word *({self.hex_address(True)})"
 
+    def to_c(self, comments=False):
+        return f"{DXDATA_C_LABEL} = *((int*)({self.hex_address(True)}));"
+
+    def __str__(self):
+        return self.to_human_readable(True)
+
+
+class DxDataShortWrite(DxDataAddress, Block):
+    __slots__ = ()
+    OPCODE = "D7000000"
+
+    def __init__(self, address: int = None):
+        if address is not None:
+            self._set_blocks(address)
 
-class DxDataShortWrite(Address, Block):
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if cls.first == "D7000000":
-            cls.address = int(cls.second, 16)
-            return cls
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first == 0xD7000000:
+            return DxDataShortWrite.from_words(first, second)
         return None
 
-    def __str__(self):
+    def _set_blocks(self, address: int):
+        if address < 0 or address > 0xFFFFFFFF:
+            raise OutOfRangeError("Address", 0, 0xFFFFFFFF, address)
+        self._first = 0xD7000000
+        self._second = address
+
+    def to_human_readable(self, comments=False):
         return f"*{DXDATA_LABEL} = short *({self.hex_address(True)})"
 
+    def to_c(self, comments=False):
+        return f"{DXDATA_C_LABEL} = *((short*)({self.hex_address(True)}));"
+
+    def __str__(self):
+        return self.to_human_readable(True)
+
+
+class DxDataByteWrite(DxDataAddress, Block):
+    __slots__ = ()
+    OPCODE = "D8000000"
+
+    def __init__(self, address: int = None):
+        if address is not None:
+            self._set_blocks(address)
 
-class DxDataByteWrite(Address, Block):
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if cls.first == "D8000000":
-            cls.address = int(cls.second, 16)
-            return cls
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first == 0xD8000000:
+            return DxDataByteWrite.from_words(first, second)
         return None
 
-    def __str__(self):
+    def _set_blocks(self, address: int):
+        if address < 0 or address > 0xFFFFFFFF:
+            raise OutOfRangeError("Address", 0, 0xFFFFFFFF, address)
+        self._first = 0xD8000000
+        self._second = address
+
+    def to_human_readable(self, comments=False):
         return f"*{DXDATA_LABEL} = byte *({self.hex_address(True)})"
 
+    def to_c(self, comments=False):
+        return f"{DXDATA_C_LABEL} = *((char*)({self.hex_address(True)}));"
+
+    def __str__(self):
+        return self.to_human_readable(True)
+
+
+class DxDataWordRead(DxDataAddress, Block):
+    __slots__ = ()
+    OPCODE = "D9000000"
+
+    def __init__(self, address: int = None):
+        if address is not None:
+            self._set_blocks(address)
 
-class DxDataWordRead(Address, Block):
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if cls.first == "D9000000":
-            cls.address = int(cls.second, 16)
-            return cls
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first == 0xD9000000:
+            return DxDataWordRead.from_words(first, second)
         return None
 
-    def __str__(self):
+    def _set_blocks(self, address: int):
+        if address < 0 or address > 0xFFFFFFFF:
+            raise OutOfRangeError("Address", 0, 0xFFFFFFFF, address)
+        self._first = 0xD9000000
+        self._second = address
+
+    def to_human_readable(self, comments=False):
         return f"*({self.hex_address(True)}) = word *{DXDATA_LABEL}; {self.OFFSET_LABEL} += 4"
 
+    def to_c(self, comments=False):
+        return f"*((int*)({self.hex_address(True)})) = {DXDATA_C_LABEL}; {self.OFFSET_LABEL} += 4;"
+
+    def __str__(self):
+        return self.to_human_readable(True)
+
+
+class DxDataShortRead(DxDataAddress, Block):
+    __slots__ = ()
+    OPCODE = "DA000000"
+
+    def __init__(self, address: int = None):
+        if address is not None:
+            self._set_blocks(address)
 
-class DxDataShortRead(Address, Block):
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if cls.first == "DA000000":
-            cls.address = int(cls.second, 16)
-            return cls
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first == 0xDA000000:
+            return DxDataShortRead.from_words(first, second)
         return None
 
-    def __str__(self):
+    def _set_blocks(self, address: int):
+        if address < 0 or address > 0xFFFFFFFF:
+            raise OutOfRangeError("Address", 0, 0xFFFFFFFF, address)
+        self._first = 0xDA000000
+        self._second = address
+
+    def to_human_readable(self, comments=False):
         return f"*({self.hex_address(True)}) = short *{DXDATA_LABEL}; {self.OFFSET_LABEL} += 2"
 
+    def to_c(self, comments=False):
+        return f"*((short*)({self.hex_address(True)})) = {DXDATA_C_LABEL}; {self.OFFSET_LABEL} += 2;"
+
+    def __str__(self):
+        return self.to_human_readable(True)
+
+
+class DxDataByteRead(DxDataAddress, Block):
+    __slots__ = ()
+    OPCODE = "DB000000"
+
+    def __init__(self, address: int = None):
+        if address is not None:
+            self._set_blocks(address)
 
-class DxDataByteRead(Address, Block):
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if cls.first == "DB000000":
-            cls.address = int(cls.second, 16)
-            return cls
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first == 0xDB000000:
+            return DxDataByteRead.from_words(first, second)
         return None
 
-    def __str__(self):
+    def _set_blocks(self, address: int):
+        if address < 0 or address > 0xFFFFFFFF:
+            raise OutOfRangeError("Address", 0, 0xFFFFFFFF, address)
+        self._first = 0xDB000000
+        self._second = address
+
+    def to_human_readable(self, comments=False):
         return f"*({self.hex_address(True)}) = byte *{DXDATA_LABEL}; {self.OFFSET_LABEL} ++"
 
+    def to_c(self, comments=False):
+        return f"*((char*)({self.hex_address(True)})) = {DXDATA_C_LABEL}; {self.OFFSET_LABEL} += 1;"
+
+    def __str__(self):
+        return self.to_human_readable(True)
+
+
+class WaitForButton(Word, Block):
+    __slots__ = ()
+    OPCODE = "DD000000"
+    BUTTONS = [
+        (0x1, "A"),
+        (0x2, "B"),
+        (0x4, "SELECT"),
+        (0x8, "START"),
+        (0x10, "RIGHT"),
+        (0x20, "LEFT"),
+        (0x40, "UP"),
+        (0x80, "DOWN"),
+        (0x100, "R"),
+        (0x200, "L"),
+        (0x400, "X"),
+        (0x800, "Y"),
+        (0x2000, "DEBUG"),
+        (0x8000, "NOT-FOLDED"),
+    ]
+    BUTTON_MASK = sum(mask for mask, _ in BUTTONS)
 
-class WaitForButton(Block):
-    buttons: List[str]
-
-    @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        cls.buttons = []
-        if cls.first == "DD000000" and cls.second != "00000000":
-            btn_code = int(cls.second, 16)
-            if btn_code & 0x1:
-                cls.buttons.append("A")
-                btn_code -= 0x1
-            if btn_code & 0x2:
-                cls.buttons.append("B")
-                btn_code -= 0x2
-            if btn_code & 0x4:
-                cls.buttons.append("SELECT")
-                btn_code -= 0x4
-            if btn_code & 0x8:
-                cls.buttons.append("START")
-                btn_code -= 0x8
-            if btn_code & 0x10:
-                cls.buttons.append("RIGHT")
-                btn_code -= 0x10
-            if btn_code & 0x20:
-                cls.buttons.append("LEFT")
-                btn_code -= 0x20
-            if btn_code & 0x40:
-                cls.buttons.append("UP")
-                btn_code -= 0x40
-            if btn_code & 0x80:
-                cls.buttons.append("DOWN")
-                btn_code -= 0x80
-            if btn_code & 0x100:
-                cls.buttons.append("R")
-                btn_code -= 0x100
-            if btn_code & 0x200:
-                cls.buttons.append("L")
-                btn_code -= 0x200
-            if btn_code & 0x400:
-                cls.buttons.append("X")
-                btn_code -= 0x400
-            if btn_code & 0x800:
-                cls.buttons.append("Y")
-                btn_code -= 0x800
-            if btn_code & 0x2000:
-                cls.buttons.append("DEBUG")
-                btn_code -= 0x2000
-            if btn_code & 0x8000:
-                cls.buttons.append("NOT-FOLDED")
-                btn_code -= 0x8000
-            if btn_code == 0:
-                return cls
+    def __init__(self, value: int = None):
+        if value is not None:
+            self._set_blocks(value)
+
+    @classmethod
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first == 0xDD000000 and second != 0 and second & ~cls.BUTTON_MASK == 0:
+            return WaitForButton.from_words(first, second)
         return None
 
-    def __str__(self):
+    def _set_blocks(self, value: int):
+        if value < 0 or value > 0xFFFFFFFF:
+            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, value)
+        self._first = 0xDD000000
+        self._second = value
+
+    @property
+    def buttons(self) -> List[str]:
+        return [name for mask, name in self.BUTTONS if self._second & mask]
+
+    def to_human_readable(self, comments=False):
         return f"On {str.join(' + ', self.buttons)}:"
 
+    def to_c(self, comments=False):
+        return f"if ((buttons & {self.hex_value(comments, True)}) == {self.hex_value()}) {{"
+
+    def __str__(self):
+        return self.to_human_readable(True)
+
 
 class Patch(Address, Block):
-    value: int
-    bytes: str
+    __slots__ = ('bytes',)
+    OPCODE = "E"
+    PREVIEW = 32  # Payload bytes shown by __str__
+    bytes: bytearray
+
+    def __init__(self, value: int = None, address: int = None):
+        self.bytes = bytearray()
+        if value is not None and address is not None:
+            self._set_blocks(value, address)
+
+    @property
+    def value(self) -> int:
+        return self._second
 
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if cls.first[0] == "E":
-            cls.value = int(cls.second, 16)
-            cls.address = int(cls.first[1:], 16)
-            cls.bytes = ""
-            return cls
+    def from_words(cls, first: int, second: int) -> Block:
+        block = super(Patch, cls).from_words(first, second)
+        block.bytes = bytearray()
+        return block
+
+    @classmethod
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first >> 28 == 0xE:
+            return Patch.from_words(first, second)
         return None
 
+    def _set_blocks(self, value: int, address: int):
+        if value < 0 or value > 0xFFFFFFFF:
+            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, value)
+        if address < 0 or address > 0xFFFFFFF:
+            raise OutOfRangeError("Address", 0, 0xFFFFFFF, address)
+        self._first = 0xE0000000 | address
+        self._second = value
+
     def consume(self, bytestr: str) -> str:
-        if len(self.bytes) == self.value:
+        """
+        Append the payload carried by a code line of whole 8-digit words. The words are stored little-endian, the way
+        the code list sits in memory. Returns the hex digits of the bytes that weren't needed.
+        """
+        missing = self.value - len(self.bytes)
+        if missing <= 0:
             return bytestr
-        while len(self.bytes) < self.value:
-            self.bytes += bytestr[0]
-            bytestr = bytestr[1:]
-            if len(self.bytes) == self.value:
-                return bytestr
-        return bytestr
+        words = array('I', bytes.fromhex(bytestr))
+        words.byteswap()
+        data = words.tobytes()
+        self.bytes += data[:missing]
+        return data[missing:].hex().upper()
+
+    def consume_words(self, first: int, second: int) -> bytes:
+        """Like consume, for a code line given as two words. Returns the bytes that weren't needed."""
+        data = first.to_bytes(4, 'little') + second.to_bytes(4, 'little')
+        missing = self.value - len(self.bytes)
+        if missing <= 0:
+            return data
+        self.bytes += data[:missing]
+        return data[missing:]
+
+    def words(self) -> Iterator[str]:
+        """The payload as written in the code list, one word (or the digits of the final partial word) at a time."""
+        for i in range(0, len(self.bytes), 4):
+            chunk = self.bytes[i:i + 4]
+            yield f"{int.from_bytes(chunk, 'little'):0{2 * len(chunk)}X}"
 
-    def __str__(self):
-        formatted_bytes = str.join(' ', [self.bytes[i:i + 8] for i in range(0, len(self.bytes), 8)])
+    def to_human_readable(self, comments=False):
+        formatted_bytes = str.join(' ', islice(self.words(), self.PREVIEW // 4))
+        if len(self.bytes) > self.PREVIEW:
+            formatted_bytes += " ..."
         return f"Copy 0x{formatted_bytes}({self.value} bytes) to {self.hex_address(True)}"
 
+    def to_c(self, comments=False):
+        payload = str.join('', [f"\\x{byte:02X}" for byte in self.bytes])
+        return f"memcpy((void*)({self.hex_address(True)}), \"{payload}\", {self.value});"
+
+    def __str__(self):
+        return self.to_human_readable(True)
+
 
 class Memory(Word, Address, Block):
+    __slots__ = ()
+    OPCODE = "F"
+
+    def __init__(self, value: int = None, address: int = None):
+        if value is not None and address is not None:
+            self._set_blocks(value, address)
+
     @classmethod
-    def parse(cls, first="", second="") -> Optional[Block]:
-        if cls.first[0] == "F":
-            cls.value = int(cls.second, 16)
-            cls.address = int(cls.first[1:], 16)
-            return cls
+    def parse_words(cls, first: int, second: int) -> Optional[Block]:
+        if first >> 28 == 0xF:
+            return Memory.from_words(first, second)
         return None
 
-    def __str__(self):
+    def _set_blocks(self, value: int, address: int):
+        if value < 0 or value > 0xFFFFFFFF:
+            raise OutOfRangeError("Value", 0, 0xFFFFFFFF, value)
+        if address < 0 or address > 0xFFFFFFF:
+            raise OutOfRangeError("Address", 0, 0xFFFFFFF, address)
+        self._first = 0xF0000000 | address
+        self._second = value
+
+    def to_human_readable(self, comments=False):
         return f"Copy {self.value} bytes from {self.OFFSET_LABEL} to {self.hex_address()}"
+
+    def to_c(self, comments=False):
+        return f"memcpy((void*){self.hex_address()}, (void*){self.OFFSET_LABEL}, {self.value});"
+
+    def __str__(self):
+        return self.to_human_readable(True)
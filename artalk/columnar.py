@@ -0,0 +1,250 @@
+import operator
+from typing import List, Dict, Optional, Union
+
+import numpy as np
+
+from artalk import binary
+from artalk.codeblocks import Block, Patch, WaitForButton, Conditional32bitCodes, Conditional16bitCodes, Conditions
+from artalk.parser import Code
+
+# Block classes in registration order; a block's kind is its index in this list, -1 when the opcode is unknown.
+TYPES: List[type] = list(Block.OPCODES.values())
+PATCH = TYPES.index(Patch)
+
+_NIBBLE_KINDS = np.full(16, -1, dtype=np.int16)
+_WORDS = []
+_WORD_KINDS = []
+for _kind, (_opcode, _block) in enumerate(Block.OPCODES.items()):
+    if len(_opcode) == 1:
+        _NIBBLE_KINDS[int(_opcode, 16)] = _kind
+    else:
+        _WORDS.append(int(_opcode, 16))
+        _WORD_KINDS.append(_kind)
+_ORDER = np.argsort(_WORDS)
+_WORDS = np.array(_WORDS, dtype=np.uint32)[_ORDER]
+_WORD_KINDS = np.array(_WORD_KINDS, dtype=np.int16)[_ORDER]
+
+_BUTTONS = np.uint32(WaitForButton.BUTTON_MASK)
+
+# Per conditional kind: its width in bytes and the index of its condition in _CONDITIONS
+_CONDITIONS = [operator.gt, operator.lt, operator.eq, operator.ne]
+_CONDITION_INDEX = {Conditions.GREATERTHAN: 0, Conditions.LESSTHAN: 1, Conditions.EQUALTO: 2,
+                    Conditions.NOTEQUALTO: 3}
+_WIDTHS = np.zeros(len(TYPES), dtype=np.int8)
+_CONDITION_KINDS = np.full(len(TYPES), -1, dtype=np.int8)
+for _kind, _block in enumerate(TYPES):
+    if issubclass(_block, (Conditional32bitCodes, Conditional16bitCodes)):
+        _WIDTHS[_kind] = 4 if issubclass(_block, Conditional32bitCodes) else 2
+        _CONDITION_KINDS[_kind] = _CONDITION_INDEX[_block.condition]
+
+
+def _kinds(*names: str) -> List[int]:
+    return [kind for kind, block in enumerate(TYPES) if block.__name__ in names]
+
+
+class BlockStore:
+    """
+    All blocks of a database as uint32 columns. Classification, address/value/mask extraction and validation run as
+    array operations; Block objects are only created when asked for.
+    """
+    first: np.ndarray
+    second: np.ndarray
+    code_id: np.ndarray
+    titles: List[str]
+
+    def __init__(self, first: np.ndarray, second: np.ndarray, code_id: np.ndarray, titles: List[str],
+                 patch_rows: np.ndarray = None, payload_offsets: np.ndarray = None, payloads: bytes = b""):
+        self.first = first
+        self.second = second
+        self.code_id = code_id
+        self.titles = titles
+        self.patch_rows = patch_rows if patch_rows is not None else np.zeros(0, dtype=np.int64)
+        self.payload_offsets = payload_offsets if payload_offsets is not None else np.zeros(1, dtype=np.int64)
+        self.payloads = payloads
+        self._kinds: Optional[np.ndarray] = None
+        self._valid: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_codes(cls, codes: List[Code]) -> 'BlockStore':
+        first = []
+        second = []
+        code_id = []
+        patch_rows = []
+        payload_offsets = [0]
+        payloads = bytearray()
+        for index, code in enumerate(codes):
+            for block in code.blocks:
+                if type(block) == Patch:
+                    patch_rows.append(len(first))
+                    payloads += block.bytes
+                    payload_offsets.append(len(payloads))
+                first.append(block._first)
+                second.append(block._second)
+                code_id.append(index)
+        return cls(
+            np.array(first, dtype=np.uint32),
+            np.array(second, dtype=np.uint32),
+            np.array(code_id, dtype=np.uint32),
+            [code.title for code in codes],
+            np.array(patch_rows, dtype=np.int64),
+            np.array(payload_offsets, dtype=np.int64),
+            bytes(payloads),
+        )
+
+    @classmethod
+    def from_binary(cls, data) -> 'BlockStore':
+        """Build a store straight from an artalk.binary dump; the block columns are views into data."""
+        tables = binary.read_tables(data)
+        blocks = np.frombuffer(tables.blocks, dtype=np.uint32).reshape(-1, 2)
+        counts = np.frombuffer(tables.counts, dtype=np.uint32)
+        title_ends = np.cumsum(np.frombuffer(tables.title_lengths, dtype=np.uint32), dtype=np.int64)
+        raw_titles = bytes(tables.titles)
+        titles = [str(raw_titles[begin:end], 'utf-8') for begin, end in zip(np.r_[0, title_ends[:-1]], title_ends)]
+        store = cls(
+            blocks[:, 0],
+            blocks[:, 1],
+            np.repeat(np.arange(len(counts), dtype=np.uint32), counts),
+            titles,
+        )
+        store.patch_rows = np.flatnonzero(store.kinds() == PATCH)
+        store.payload_offsets = np.r_[0, np.cumsum(np.frombuffer(tables.payload_lengths, dtype=np.uint32),
+                                                   dtype=np.int64)]
+        store.payloads = bytes(tables.payloads)
+        return store
+
+    def __len__(self):
+        return len(self.first)
+
+    def kinds(self) -> np.ndarray:
+        """Index into TYPES for every block, from the first nibble or the full first word of D-type blocks."""
+        if self._kinds is None:
+            nibbles = self.first >> 28
+            kinds = _NIBBLE_KINDS[nibbles]
+            d_rows = np.flatnonzero(nibbles == 0xD)
+            words = self.first[d_rows]
+            positions = np.minimum(np.searchsorted(_WORDS, words), len(_WORDS) - 1)
+            kinds[d_rows] = np.where(_WORDS[positions] == words, _WORD_KINDS[positions], -1)
+            self._kinds = kinds
+        return self._kinds
+
+    def addresses(self) -> np.ndarray:
+        return self.first & np.uint32(0x0FFFFFFF)
+
+    def values(self) -> np.ndarray:
+        """The second word, or its low half for the 16-bit conditionals (types 7-A)."""
+        conditional16 = np.isin(self.kinds(), _kinds("SGreaterThan", "SLessThan", "SEqualTo", "SNotEqualTo"))
+        return np.where(conditional16, self.second & np.uint32(0xFFFF), self.second)
+
+    def masks(self) -> np.ndarray:
+        """The high half of the second word for the 16-bit conditionals (types 7-A), 0 for everything else."""
+        conditional16 = np.isin(self.kinds(), _kinds("SGreaterThan", "SLessThan", "SEqualTo", "SNotEqualTo"))
+        return np.where(conditional16, self.second >> 16, np.uint32(0))
+
+    def valid(self) -> np.ndarray:
+        """Whether each block would be accepted by its class' parse()."""
+        if self._valid is None:
+            kinds = self.kinds()
+            valid = kinds >= 0
+            valid &= ~np.isin(kinds, _kinds("SWrite")) | (self.second >> 16 == 0)
+            valid &= ~np.isin(kinds, _kinds("BWrite")) | (self.second >> 8 == 0)
+            valid &= ~np.isin(kinds, _kinds("LoadOffset", "ConditionEnd", "Reset")) | (self.second == 0)
+            valid &= ~np.isin(kinds, _kinds("Repeat")) | (self.first == 0xC0000000)
+            valid &= ~np.isin(kinds, _kinds("WaitForButton")) | ((self.second != 0) & (self.second & ~_BUTTONS == 0))
+            self._valid = valid
+        return self._valid
+
+    def type_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.kinds() + 1, minlength=len(TYPES) + 1)
+        result = {block.__name__: int(count) for block, count in zip(TYPES, counts[1:]) if count > 0}
+        if counts[0] > 0:
+            result["Unknown"] = int(counts[0])
+        return result
+
+    def address_histogram(self, bins: int = 16, mask: np.ndarray = None):
+        """Histogram of the addresses in the first word, optionally restricted to the rows selected by mask."""
+        addresses = self.addresses()
+        if mask is not None:
+            addresses = addresses[mask]
+        return np.histogram(addresses, bins=bins, range=(0, 0x10000000))
+
+    def conditionals(self) -> np.ndarray:
+        """The rows of the 32-bit and 16-bit conditionals (types 3-A)."""
+        kinds = self.kinds()
+        return np.flatnonzero((kinds >= 0) & (_WIDTHS[kinds] > 0))
+
+    def evaluate(self, dumps: np.ndarray, base: int = 0, chunk: int = 1024) -> np.ndarray:
+        """
+        Evaluate every conditional against a stack of RAM dumps starting at base, one dump per row of dumps (uint8 or
+        uint32, e.g. from map_dumps). Returns a boolean matrix with a row per dump and a column per conditional (in
+        the order of conditionals()), as "value OP [address]" with the offset at 0, and masked values for 16-bit
+        conditionals. Conditionals reading outside of the dumps are False. Dumps are read chunk rows at a time.
+        """
+        dumps = _as_bytes(dumps)
+        rows = self.conditionals()
+        kinds = self.kinds()[rows]
+        widths = _WIDTHS[kinds]
+        conditions = _CONDITION_KINDS[kinds]
+        values = self.values()[rows]
+        keep = ~self.masks()[rows] & np.uint32(0xFFFF)
+        positions = self.addresses()[rows].astype(np.int64) - base
+        inside = (positions >= 0) & (positions + widths <= dumps.shape[1])
+        positions = np.where(inside, positions, 0)
+        word = widths == 4
+        last = max(dumps.shape[1] - 1, 0)
+        word_index = np.minimum(positions[word, None] + np.arange(4), last)
+        short_index = np.minimum(positions[~word, None] + np.arange(2), last)
+
+        result = np.zeros((len(dumps), len(rows)), dtype=bool)
+        for begin in range(0, len(dumps), chunk):
+            block = dumps[begin:begin + chunk]
+            memory = np.empty((len(block), len(rows)), dtype=np.uint32)
+            memory[:, word] = np.ascontiguousarray(block[:, word_index]).view('<u4')[..., 0]
+            memory[:, ~word] = np.ascontiguousarray(block[:, short_index]).view('<u2')[..., 0] & keep[~word]
+            for index, compare in enumerate(_CONDITIONS):
+                columns = conditions == index
+                result[begin:begin + chunk, columns] = compare(values[columns], memory[:, columns])
+        result[:, ~inside] = False
+        return result
+
+    def activations(self, dumps: np.ndarray, base: int = 0) -> np.ndarray:
+        """
+        Whether all conditionals of each code hold, per dump: a matrix with a row per dump and a column per code.
+        Codes without conditionals are always active.
+        """
+        matrix = self.evaluate(dumps, base)
+        result = np.ones((len(matrix), len(self.titles)), dtype=bool)
+        codes, starts = np.unique(self.code_id[self.conditionals()], return_index=True)
+        if len(codes) > 0:
+            result[:, codes] = np.logical_and.reduceat(matrix, starts, axis=1)
+        return result
+
+    def block(self, row: int) -> Block:
+        kind = int(self.kinds()[row])
+        if not self.valid()[row]:
+            raise Exception(f"No matching block pattern found: \"{int(self.first[row]):08X} "
+                            f"{int(self.second[row]):08X}\"")
+        block = TYPES[kind].from_words(int(self.first[row]), int(self.second[row]))
+        if type(block) == Patch:
+            index = int(np.searchsorted(self.patch_rows, row))
+            begin, end = self.payload_offsets[index], self.payload_offsets[index + 1]
+            block.bytes = bytearray(self.payloads[begin:end])
+        return block
+
+    def code(self, index: int) -> Code:
+        code = Code(title=self.titles[index])
+        begin, end = np.searchsorted(self.code_id, [index, index + 1])
+        code.blocks = [self.block(row) for row in range(begin, end)]
+        return code
+
+
+def map_dumps(path: str, size: int) -> np.ndarray:
+    """A file of concatenated RAM dumps of size bytes each as a read-only, memory-mapped (dumps, size) uint8 matrix."""
+    return np.memmap(path, dtype=np.uint8, mode='r').reshape(-1, size)
+
+
+def _as_bytes(dumps: Union[np.ndarray, np.memmap]) -> np.ndarray:
+    if dumps.ndim != 2:
+        raise Exception(f"Expected a 2D stack of dumps, got {dumps.ndim} dimensions.")
+    if dumps.dtype == np.uint8:
+        return dumps
+    return np.ascontiguousarray(dumps).view(np.uint8).reshape(len(dumps), -1)
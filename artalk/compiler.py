@@ -0,0 +1,160 @@
+import weakref
+from typing import Callable, List, Optional, Tuple, Dict, Any, Iterable, Union
+
+from artalk.codeblocks import Block, WWrite, SWrite, BWrite, Conditional16bitCodes, LoadOffset, SetOffset1, \
+    AddToOffset, Reset, AddToDxData, SetDxData, DxDataWordWrite, DxDataShortWrite, DxDataByteWrite, DxDataWordRead, \
+    DxDataShortRead, DxDataByteRead, Patch, Memory, RepetitionEnd
+from artalk.flow import Node, LoopNode, ButtonNode
+
+# A compiled code: takes the memory and the pressed buttons and returns the final (offset, DxData) registers.
+Function = Callable[[Any, int], Tuple[int, int]]
+
+OFFSET_BLOCKS = (LoadOffset, SetOffset1, AddToOffset, Reset, DxDataWordRead, DxDataShortRead, DxDataByteRead,
+                 RepetitionEnd)
+
+
+class Compiler:
+    """
+    Translates the flow tree of a code (see artalk.flow) into the source of one Python function and compiles it.
+    Values, masks and addresses become literals, the nesting becomes if statements and for loops, and the offset is
+    tracked at compile time so that addresses are folded to constants as long as the offset is known. The result
+    behaves like artalk.vm.Machine.run on the same code.
+    """
+    INDENT = "    "
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.constants: Dict[str, bytes] = {}
+
+    def compile(self, code) -> Function:
+        source = self.source(code)
+        namespace = dict(self.constants)
+        exec(compile(source, f"<artalk code {code.title!r}>", 'exec'), namespace)
+        function = namespace['run']
+        function.source = source
+        return function
+
+    def source(self, code) -> str:
+        self.lines = [
+            "def run(memory, buttons=0):",
+            "    read32, read16, read8 = memory.read32, memory.read16, memory.read8",
+            "    write32, write16, write8 = memory.write32, memory.write16, memory.write8",
+            "    offset = 0",
+            "    dxdata = 0",
+        ]
+        self.constants = {}
+        self._children(code.flow(), 1, 0)
+        self.lines.append("    return offset, dxdata")
+        return "\n".join(self.lines) + "\n"
+
+    def _children(self, node: Node, depth: int, offset: Optional[int]) -> Optional[int]:
+        """Emit the children of a node; offset is the value of the offset register if known. Returns it after."""
+        emitted = len(self.lines)
+        for child in node.children:
+            if isinstance(child, Node):
+                offset = self._node(child, depth, offset)
+            else:
+                offset = self._statement(child, depth, offset)
+        if len(self.lines) == emitted:  # No children, or only ones that emit nothing (e.g. an unclosed loop of 0)
+            self._emit(depth, "pass")
+        return offset
+
+    def _node(self, node: Node, depth: int, offset: Optional[int]) -> Optional[int]:
+        block = node.block
+        if type(node) == LoopNode:
+            if node.end is None:  # Not closed by D1: the body runs once, unless the count is 0
+                if block.value == 0:
+                    return offset
+                return self._children(node, depth, offset)
+            self._emit(depth, f"for _ in range({block.value}):")
+            changes = node.end.value != 0 or any(type(child) in OFFSET_BLOCKS for child in node.walk()
+                                                 if child is not node.end)
+            body_offset = None if changes else offset
+            self._children(node, depth + 1, body_offset)
+            if node.end.value != 0:
+                self._emit(depth + 1, f"offset = (offset + {node.end.value:#x}) & 0xFFFFFFFF")
+            return body_offset
+        if type(node) == ButtonNode:
+            self._emit(depth, f"if buttons & {block.value:#x} == {block.value:#x}:")
+        elif isinstance(block, Conditional16bitCodes):
+            self._emit(depth, f"if {block.value:#x} {block.condition.value} "
+                              f"read16({self._address(block, offset)}) & {0xFFFF & ~block.mask:#x}:")
+        else:
+            self._emit(depth, f"if {block.value:#x} {block.condition.value} read32({self._address(block, offset)}):")
+        after = self._children(node, depth + 1, offset)
+        return offset if after == offset else None
+
+    def _statement(self, block: Block, depth: int, offset: Optional[int]) -> Optional[int]:
+        kind = type(block)
+        if kind == WWrite:
+            self._emit(depth, f"write32({self._address(block, offset)}, {block.value:#x})")
+        elif kind == SWrite:
+            self._emit(depth, f"write16({self._address(block, offset)}, {block.value:#x})")
+        elif kind == BWrite:
+            self._emit(depth, f"write8({self._address(block, offset)}, {block.value:#x})")
+        elif kind == LoadOffset:
+            self._emit(depth, f"offset = read32({self._address(block, offset)})")
+            return None
+        elif kind == SetOffset1:
+            self._emit(depth, f"offset = {block.value:#x}")
+            return block.value
+        elif kind == AddToOffset:
+            self._emit(depth, f"offset = (offset + {block.value:#x}) & 0xFFFFFFFF")
+            return None if offset is None else (offset + block.value) & 0xFFFFFFFF
+        elif kind == Reset:
+            self._emit(depth, "offset = 0")
+            self._emit(depth, "dxdata = 0")
+            return 0
+        elif kind == SetDxData:
+            self._emit(depth, f"dxdata = {block.value:#x}")
+        elif kind == AddToDxData:
+            self._emit(depth, f"dxdata = (dxdata + {block.value:#x}) & 0xFFFFFFFF")
+        elif kind in (DxDataWordWrite, DxDataShortWrite, DxDataByteWrite):
+            width = {DxDataWordWrite: 32, DxDataShortWrite: 16, DxDataByteWrite: 8}[kind]
+            self._emit(depth, f"dxdata = read{width}({self._address(block, offset)})")
+        elif kind in (DxDataWordRead, DxDataShortRead, DxDataByteRead):
+            width = {DxDataWordRead: 32, DxDataShortRead: 16, DxDataByteRead: 8}[kind]
+            self._emit(depth, f"write{width}({self._address(block, offset)}, dxdata)")
+            self._emit(depth, f"offset = (offset + {width // 8}) & 0xFFFFFFFF")
+            return None if offset is None else (offset + width // 8) & 0xFFFFFFFF
+        elif kind == Patch:
+            name = f"PAYLOAD_{len(self.constants)}"
+            self.constants[name] = bytes(block.bytes)
+            self._emit(depth, f"memory.write({self._address(block, offset)}, {name})")
+        elif kind == Memory:
+            source = "offset" if offset is None else f"{offset:#x}"
+            self._emit(depth, f"memory.copy({block.address:#x}, {source}, {block.value})")
+        else:
+            raise Exception(f"Can't compile {kind.__name__}: \"{block.first} {block.second}\"")
+        return offset
+
+    @staticmethod
+    def _address(block: Block, offset: Optional[int]) -> str:
+        if offset is None:
+            return f"({block.address:#x} + offset) & 0xFFFFFFFF"
+        return f"{(block.address + offset) & 0xFFFFFFFF:#x}"
+
+    def _emit(self, depth: int, line: str):
+        self.lines.append(self.INDENT * depth + line)
+
+
+_functions = weakref.WeakKeyDictionary()  # Code -> (blocks, function)
+
+
+def compile_code(code) -> Function:
+    """The compiled function of a code, compiled once and kept until its blocks change."""
+    blocks = tuple(code.blocks)
+    entry = _functions.get(code)
+    if entry is None or entry[0] != blocks:
+        entry = (blocks, Compiler().compile(code))
+        _functions[code] = entry
+    return entry[1]
+
+
+def run_frames(codes: Iterable, memory, frames: int, buttons: Union[int, Callable[[int], int]] = 0):
+    """Run every code once per frame, like a cheat engine does. buttons may be a function of the frame number."""
+    functions = [compile_code(code) for code in codes]
+    for frame in range(frames):
+        pressed = buttons(frame) if callable(buttons) else buttons
+        for function in functions:
+            function(memory, pressed)
@@ -0,0 +1,113 @@
+from typing import List, Optional, Union, Iterator, Sequence
+
+from artalk.codeblocks import Block, Conditional32bitCodes, Conditional16bitCodes, Repeat, WaitForButton, \
+    ConditionEnd, RepetitionEnd, Reset
+
+
+class Node:
+    """
+    A nesting level of a code. Children are plain blocks or nested nodes, in code order. block is the block that
+    opened the node and end the one that closed it; end is None if the node was closed by a Reset (D2) or by the end
+    of the code. index and end_index are the positions of those blocks in Code.blocks.
+    """
+    __slots__ = ('block', 'index', 'children', 'end', 'end_index')
+    KIND = "root"
+
+    block: Optional[Block]
+    index: Optional[int]
+    children: List[Union[Block, 'Node']]
+    end: Optional[Block]
+    end_index: Optional[int]
+
+    def __init__(self, block: Block = None, index: int = None):
+        self.block = block
+        self.index = index
+        self.children = []
+        self.end = None
+        self.end_index = None
+
+    def nodes(self) -> Iterator['Node']:
+        """All nested nodes, depth first."""
+        for child in self.children:
+            if isinstance(child, Node):
+                yield child
+                yield from child.nodes()
+
+    def walk(self) -> Iterator[Block]:
+        """The blocks of this node in code order, including the opening and closing blocks."""
+        if self.block is not None:
+            yield self.block
+        for child in self.children:
+            if isinstance(child, Node):
+                yield from child.walk()
+            else:
+                yield child
+        if self.end is not None:
+            yield self.end
+
+    def depth(self) -> int:
+        return max((1 + node.depth() for node in self.children if isinstance(node, Node)), default=0)
+
+
+class ConditionNode(Node):
+    """Opened by one of the 3-A conditionals, closed by ConditionEnd (D0)."""
+    __slots__ = ()
+    KIND = "condition"
+
+
+class ButtonNode(Node):
+    """Opened by WaitForButton (DD), closed by ConditionEnd (D0)."""
+    __slots__ = ()
+    KIND = "button"
+
+
+class LoopNode(Node):
+    """Opened by Repeat (C0), closed by RepetitionEnd (D1)."""
+    __slots__ = ()
+    KIND = "loop"
+
+
+def build(blocks: Sequence[Block], line_numbers: Sequence[int] = ()) -> Node:
+    """
+    Nest the blocks of a code in a single pass. Reset (D2) closes every open node, nodes still open at the end of the
+    code are closed implicitly. A closing block that doesn't match the innermost open node raises, naming the line
+    (from line_numbers, if known) of both blocks.
+    """
+    root = Node()
+    stack = [root]
+    for index, block in enumerate(blocks):
+        kind = type(block)
+        top = stack[-1]
+        if isinstance(block, (Conditional32bitCodes, Conditional16bitCodes)):
+            node = ConditionNode(block, index)
+        elif kind == Repeat:
+            node = LoopNode(block, index)
+        elif kind == WaitForButton:
+            node = ButtonNode(block, index)
+        elif kind == ConditionEnd or kind == RepetitionEnd:
+            expected = LoopNode if kind == RepetitionEnd else (ConditionNode, ButtonNode)
+            if not isinstance(top, expected):
+                if top is root:
+                    raise Exception(f"{_position(index, line_numbers)}: {kind.__name__} without an open block")
+                raise Exception(f"{_position(index, line_numbers)}: {kind.__name__} can't close the {top.KIND} "
+                                f"opened at {_position(top.index, line_numbers).lower()}")
+            top.end = block
+            top.end_index = index
+            stack.pop()
+            continue
+        elif kind == Reset:
+            del stack[1:]
+            root.children.append(block)
+            continue
+        else:
+            top.children.append(block)
+            continue
+        top.children.append(node)
+        stack.append(node)
+    return root
+
+
+def _position(index: int, line_numbers: Sequence[int]) -> str:
+    if index < len(line_numbers):
+        return f"Line {line_numbers[index]}"
+    return f"Block {index + 1}"
@@ -0,0 +1,169 @@
+import argparse
+import random
+from typing import Dict, Iterator, List, Sequence, TextIO, Tuple
+
+from artalk.codeblocks import Block, MemoryWrite, Conditional32bitCodes, Conditional16bitCodes, Conditions, Repeat, \
+    RepetitionEnd, ConditionEnd, Reset, SetOffset1, AddToDxData, DxDataWordWrite, DxDataShortWrite, DxDataByteWrite, \
+    DxDataWordRead, DxDataShortRead, DxDataByteRead, WaitForButton, Patch, Memory
+from artalk.parser import Code
+
+
+class Generator:
+    """
+    Seeded source of valid codes for load testing. The same seed and settings always produce the same document.
+    Codes are built from the block constructors and rendered lazily, so arbitrarily large files can be streamed.
+    """
+    # Relative weights of the code shapes, roughly as they appear in real databases
+    DISTRIBUTION = {
+        "write": 50,
+        "conditional": 25,
+        "loop": 8,
+        "dxdata": 8,
+        "button": 5,
+        "patch": 3,
+        "memory": 1,
+    }
+    NESTING = ("conditional", "loop", "button")
+    BUTTONS = [mask for mask, _ in WaitForButton.BUTTONS]
+
+    seed: int
+    distribution: Dict[str, int]
+    max_depth: int
+    patch_sizes: Sequence[int]
+    shapes_per_code: Tuple[int, int]
+
+    def __init__(self, seed: int = 0, distribution: Dict[str, int] = None, max_depth: int = 2,
+                 patch_sizes: Sequence[int] = (4, 8, 16, 32, 64), shapes_per_code: Tuple[int, int] = (1, 6)):
+        """
+        distribution maps shape names (see DISTRIBUTION) to weights. Conditionals, loops and button checks nest up to
+        max_depth levels. Patch payload sizes are picked from patch_sizes.
+        """
+        self.seed = seed
+        self.distribution = distribution if distribution is not None else self.DISTRIBUTION
+        unknown = set(self.distribution) - set(self.DISTRIBUTION)
+        if unknown:
+            raise Exception(f"Unknown shapes: {', '.join(sorted(unknown))}")
+        self.max_depth = max_depth
+        self.patch_sizes = patch_sizes
+        self.shapes_per_code = shapes_per_code
+        self.random = random.Random(seed)
+        self._shapes = list(self.distribution)
+        self._weights = [self.distribution[shape] for shape in self._shapes]
+
+    def codes(self) -> Iterator[Code]:
+        """An endless stream of codes."""
+        number = 0
+        while True:
+            code = Code(title=f"Code {number}")
+            code.blocks = self.blocks(0) + [Reset()]
+            number += 1
+            yield code
+
+    def blocks(self, depth: int) -> List[Block]:
+        blocks = []
+        for shape in self.random.choices(self._shapes, self._weights, k=self.random.randint(*self.shapes_per_code)):
+            if depth >= self.max_depth and shape in self.NESTING:
+                shape = "write"
+            blocks.extend(getattr(self, f"_{shape}")(depth))
+        return blocks
+
+    def lines(self, count: int = None) -> Iterator[str]:
+        """Lines of whole codes, separated by blank lines, until at least count lines were produced (or forever)."""
+        produced = 0
+        for code in self.codes():
+            lines = self.render(code)
+            yield from lines
+            produced += len(lines)
+            if count is not None and produced >= count:
+                return
+
+    def document(self, lines: int) -> str:
+        return "\n".join(self.lines(lines)) + "\n"
+
+    def write(self, file: TextIO, lines: int = None, size: int = None) -> int:
+        """Stream codes to a text file until it holds at least the given number of lines or bytes. Returns the size."""
+        if lines is None and size is None:
+            raise Exception("Either lines or size must be given.")
+        written = 0
+        produced = 0
+        buffer = []
+        for line in self.lines():
+            buffer.append(line + "\n")
+            written += len(line) + 1
+            produced += 1
+            if line == "":  # End of a code
+                file.writelines(buffer)
+                buffer.clear()
+                if (lines is not None and produced >= lines) or (size is not None and written >= size):
+                    break
+        return written
+
+    @staticmethod
+    def render(code: Code) -> List[str]:
+        lines = [f"[{code.title}]"]
+        for block in code.blocks:
+            lines.append(f"{block.first} {block.second}")
+            if type(block) == Patch:
+                words = [f"{int(word, 16):08X}" for word in block.words()]
+                if len(words) % 2:
+                    words.append("00000000")
+                lines.extend(f"{words[i]} {words[i + 1]}" for i in range(0, len(words), 2))
+        lines.append("")
+        return lines
+
+    def _address(self) -> int:
+        return self.random.randrange(0, 0x1000000, 2)
+
+    def _write(self, depth: int) -> List[Block]:
+        value = self.random.getrandbits(self.random.choice([8, 16, 32]))
+        return [MemoryWrite.create(value, self._address())]
+
+    def _conditional(self, depth: int) -> List[Block]:
+        condition = self.random.choice(list(Conditions))
+        if self.random.random() < 0.5:
+            block = Conditional32bitCodes.create(self.random.getrandbits(32), condition, self._address())
+        else:
+            block = Conditional16bitCodes.create(self.random.getrandbits(16), condition, self._address(),
+                                                 self.random.choice([0, 0xFF00, 0x00FF]))
+        return [block] + self.blocks(depth + 1) + [ConditionEnd()]
+
+    def _loop(self, depth: int) -> List[Block]:
+        return [Repeat(self.random.randint(1, 64))] + self.blocks(depth + 1) + \
+            [RepetitionEnd(self.random.choice([2, 4, 8]))]
+
+    def _button(self, depth: int) -> List[Block]:
+        buttons = sum(self.random.sample(self.BUTTONS, self.random.randint(1, 2)))
+        return [WaitForButton(buttons)] + self.blocks(depth + 1) + [ConditionEnd()]
+
+    def _dxdata(self, depth: int) -> List[Block]:
+        load = self.random.choice([DxDataWordWrite, DxDataShortWrite, DxDataByteWrite])
+        store = self.random.choice([DxDataWordRead, DxDataShortRead, DxDataByteRead])
+        return [SetOffset1(self._address()), load(self._address()), AddToDxData(self.random.getrandbits(8)),
+                store(self._address())]
+
+    def _patch(self, depth: int) -> List[Block]:
+        size = self.random.choice(self.patch_sizes)
+        block = Patch(size, self._address())
+        block.bytes = bytearray(self.random.getrandbits(8) for _ in range(size))
+        return [block]
+
+    def _memory(self, depth: int) -> List[Block]:
+        return [SetOffset1(self._address()), Memory(self.random.randint(1, 256), self._address())]
+
+
+def main(args: List[str] = None):
+    parser = argparse.ArgumentParser(description="Write a seeded synthetic code database.")
+    parser.add_argument("output")
+    parser.add_argument("--lines", type=int)
+    parser.add_argument("--size", type=int, help="size in bytes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--depth", type=int, default=2, help="maximum nesting of conditions and loops")
+    parser.add_argument("--patch-sizes", type=int, nargs="+", default=[4, 8, 16, 32, 64])
+    options = parser.parse_args(args)
+    generator = Generator(options.seed, max_depth=options.depth, patch_sizes=options.patch_sizes)
+    with open(options.output, 'w', buffering=1024 * 1024) as file:
+        generator.write(file, options.lines, options.size)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+import copy
+import hashlib
+from typing import List, Dict, Tuple
+
+from artalk.parser import Parser, Code
+
+
+class ParseResult:
+    """
+    Codes of one document version, the digest and first line of each code's section and the changes to the previous
+    version.
+    """
+    codes: List[Code]
+    digests: List[bytes]
+    lines: List[int]
+    added: List[Code]
+    removed: List[Code]
+    modified: List[Tuple[Code, Code]]
+
+    def __init__(self):
+        self.codes = []
+        self.digests = []
+        self.lines = []
+        self.added = []
+        self.removed = []
+        self.modified = []
+
+
+class IncrementalParser:
+    """
+    Reparses only the sections (a title line up to the next one) whose content changed since the previous result.
+    Codes of unchanged sections are reused; if the section moved, as a copy sharing the blocks with the new line
+    numbers, so previous results stay valid.
+    """
+    parser: Parser
+
+    def __init__(self, parser: Parser = None):
+        self.parser = parser if parser is not None else Parser()
+
+    def parse(self, string: str) -> ParseResult:
+        return self.reparse(ParseResult(), string)
+
+    def reparse(self, previous: ParseResult, string: str) -> ParseResult:
+        unchanged: Dict[bytes, List[Tuple[Code, int]]] = {}
+        for digest, code, line in zip(previous.digests, previous.codes, previous.lines):
+            unchanged.setdefault(digest, []).append((code, line))
+        result = ParseResult()
+        reparsed = []
+        for section, line in self.sections(string):
+            digest = hashlib.blake2b(section.encode('utf-8'), digest_size=16).digest()
+            codes = unchanged.get(digest)
+            if codes:
+                code, old_line = codes.pop(0)
+                if old_line != line:  # Moved: a copy with current source lines, previous stays as it was
+                    code = self._moved(code, line - old_line)
+            else:
+                code = self._parse_section(section, line)
+                reparsed.append(code)
+            result.codes.append(code)
+            result.digests.append(digest)
+            result.lines.append(line)
+
+        stale: Dict[str, List[Code]] = {}
+        for codes in unchanged.values():
+            for code, _ in codes:
+                stale.setdefault(code.title, []).append(code)
+        for code in reparsed:
+            candidates = stale.get(code.title)
+            if candidates:
+                result.modified.append((candidates.pop(0), code))
+            else:
+                result.added.append(code)
+        removed = {id(code) for codes in stale.values() for code in codes}
+        result.removed = [code for code in previous.codes if id(code) in removed]
+        return result
+
+    @staticmethod
+    def sections(string: str) -> List[Tuple[str, int]]:
+        """Split at title lines into (section text, first line number) pairs. Text before the first title is dropped."""
+        sections = []
+        begin = None
+        line = 1
+        for mtch in Parser.TITLE_START.finditer(string):
+            end = mtch.start()
+            if begin is not None:
+                sections.append((string[begin:end], line))
+            line += string.count("\n", begin or 0, end)
+            begin = end
+        if begin is not None:
+            sections.append((string[begin:], line))
+        return sections
+
+    @staticmethod
+    def _moved(code: Code, shift: int) -> Code:
+        moved = copy.copy(code)
+        moved.blocks = list(code.blocks)
+        moved.line_numbers = [number + shift for number in code.line_numbers]
+        return moved
+
+    def _parse_section(self, section: str, line: int) -> Code:
+        return self.parser.parse(section, line)[0]
@@ -0,0 +1,317 @@
+import mmap
+import re
+import struct
+from typing import Union, Dict, Optional, List, Tuple
+
+_WORD = struct.Struct("<I")
+_SHORT = struct.Struct("<H")
+
+PAGE_BITS = 12
+PAGE_SIZE = 1 << PAGE_BITS  # 4 KiB
+PAGE_MASK = PAGE_SIZE - 1
+ADDRESS_SPACE = 1 << 32
+
+
+class MemoryImage:
+    """
+    A flat, little-endian memory region starting at base, like a RAM dump of the console. Accesses outside of it
+    raise.
+    """
+    base: int
+    data: bytearray
+
+    def __init__(self, size: int = 0, base: int = 0, data: Union[bytes, bytearray] = None):
+        """A zeroed image of the given size, or one holding (a copy of) data."""
+        self.base = base
+        self.data = bytearray(data) if data is not None else bytearray(size)
+
+    def __len__(self):
+        return len(self.data)
+
+    def read32(self, address: int) -> int:
+        return _WORD.unpack_from(self.data, self._index(address, 4))[0]
+
+    def read16(self, address: int) -> int:
+        return _SHORT.unpack_from(self.data, self._index(address, 2))[0]
+
+    def read8(self, address: int) -> int:
+        return self.data[self._index(address, 1)]
+
+    def write32(self, address: int, value: int):
+        _WORD.pack_into(self.data, self._index(address, 4), value & 0xFFFFFFFF)
+
+    def write16(self, address: int, value: int):
+        _SHORT.pack_into(self.data, self._index(address, 2), value & 0xFFFF)
+
+    def write8(self, address: int, value: int):
+        self.data[self._index(address, 1)] = value & 0xFF
+
+    def read(self, address: int, size: int) -> bytes:
+        index = self._index(address, size)
+        return bytes(self.data[index:index + size])
+
+    def write(self, address: int, data: Union[bytes, bytearray, memoryview]):
+        index = self._index(address, len(data))
+        self.data[index:index + len(data)] = data
+
+    def copy(self, destination: int, source: int, size: int):
+        """Copy size bytes within the image; overlapping ranges behave like memmove."""
+        source = self._index(source, size)
+        destination = self._index(destination, size)
+        self.data[destination:destination + size] = self.data[source:source + size]
+
+    def _index(self, address: int, size: int) -> int:
+        index = address - self.base
+        if index < 0 or index + size > len(self.data):
+            raise Exception(f"Address 0x{address:08X} (+{size}) is outside of the memory image "
+                            f"0x{self.base:08X}-0x{self.base + len(self.data):08X}.")
+        return index
+
+
+class PagedMemory:
+    """
+    The whole 32-bit, little-endian address space, stored as 4 KiB pages that are allocated on the first write.
+    Untouched memory reads as zero, so memory use grows with the pages written, not with the addresses used. Has the
+    interface of MemoryImage and can be used with artalk.vm.Machine and compiled codes alike.
+
+    snapshot, restore and fork share pages copy-on-write: pages holds the pages written since the last snapshot, the
+    rest are read from the snapshot (parent) and copied into pages on their first write.
+    """
+    pages: Dict[int, bytearray]
+    parent: Optional['Snapshot']
+
+    def __init__(self, parent: 'Snapshot' = None):
+        """An empty memory, or one starting out with the contents of a snapshot."""
+        self.pages = {}
+        self.parent = parent
+
+    def __len__(self):
+        """The number of pages holding data, including the ones shared with snapshots."""
+        return len(self._visible())
+
+    @property
+    def allocated(self) -> int:
+        """The memory in bytes allocated by this memory since its last snapshot, not shared with any other."""
+        return len(self.pages) * PAGE_SIZE
+
+    def snapshot(self) -> 'Snapshot':
+        """Freeze the current contents in O(1). Later writes copy the pages they touch first."""
+        if self.pages or self.parent is None:
+            self.parent = Snapshot(self.pages, self.parent)
+            self.pages = {}
+        return self.parent
+
+    def restore(self, snapshot: 'Snapshot'):
+        """Return to the contents of a snapshot in O(1), dropping the pages written since."""
+        self.pages = {}
+        self.parent = snapshot
+
+    def fork(self) -> 'PagedMemory':
+        """An independent memory with the same contents, sharing all pages until either side writes them."""
+        return PagedMemory(self.snapshot())
+
+    def diff(self, other: Union['PagedMemory', 'Snapshot']) -> List[Tuple[int, int]]:
+        """The (start, end) address ranges, end exclusive, in which the contents differ from other."""
+        return _diff(self._visible(), other._visible())
+
+    def read32(self, address: int) -> int:
+        index = address & PAGE_MASK
+        if index <= PAGE_SIZE - 4 and 0 <= address < ADDRESS_SPACE:
+            page = self.pages.get(address >> PAGE_BITS) or self._shared(address >> PAGE_BITS)
+            return 0 if page is None else _WORD.unpack_from(page, index)[0]
+        return _WORD.unpack(self.read(address, 4))[0]
+
+    def read16(self, address: int) -> int:
+        index = address & PAGE_MASK
+        if index <= PAGE_SIZE - 2 and 0 <= address < ADDRESS_SPACE:
+            page = self.pages.get(address >> PAGE_BITS) or self._shared(address >> PAGE_BITS)
+            return 0 if page is None else _SHORT.unpack_from(page, index)[0]
+        return _SHORT.unpack(self.read(address, 2))[0]
+
+    def read8(self, address: int) -> int:
+        self._check(address, 1)
+        page = self.pages.get(address >> PAGE_BITS) or self._shared(address >> PAGE_BITS)
+        return 0 if page is None else page[address & PAGE_MASK]
+
+    def write32(self, address: int, value: int):
+        index = address & PAGE_MASK
+        if index <= PAGE_SIZE - 4 and 0 <= address < ADDRESS_SPACE:
+            _WORD.pack_into(self._page(address >> PAGE_BITS), index, value & 0xFFFFFFFF)
+        else:
+            self.write(address, _WORD.pack(value & 0xFFFFFFFF))
+
+    def write16(self, address: int, value: int):
+        index = address & PAGE_MASK
+        if index <= PAGE_SIZE - 2 and 0 <= address < ADDRESS_SPACE:
+            _SHORT.pack_into(self._page(address >> PAGE_BITS), index, value & 0xFFFF)
+        else:
+            self.write(address, _SHORT.pack(value & 0xFFFF))
+
+    def write8(self, address: int, value: int):
+        self._check(address, 1)
+        self._page(address >> PAGE_BITS)[address & PAGE_MASK] = value & 0xFF
+
+    def read(self, address: int, size: int) -> bytes:
+        return bytes(self._read(address, size))
+
+    def write(self, address: int, data: Union[bytes, bytearray, memoryview]):
+        """Write data page by page through a memoryview, without slicing copies of it."""
+        self._check(address, len(data))
+        view = memoryview(data).cast('B')
+        position = 0
+        while position < len(view):
+            index = address & PAGE_MASK
+            size = min(PAGE_SIZE - index, len(view) - position)
+            self._page(address >> PAGE_BITS)[index:index + size] = view[position:position + size]
+            position += size
+            address += size
+
+    def copy(self, destination: int, source: int, size: int):
+        """Copy size bytes; overlapping ranges behave like memmove."""
+        self._check(destination, size)
+        self.write(destination, self._read(source, size))
+
+    def load(self, path: str, base: int = 0):
+        """Map a RAM dump into memory at base. Pages that are all zero in the dump stay unallocated."""
+        with open(path, 'rb') as file:
+            size = file.seek(0, 2)
+            if size == 0:
+                return
+            self._check(base, size)
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer, memoryview(buffer) as view:
+                position = 0
+                while position < size:
+                    address = base + position
+                    length = min(PAGE_SIZE - (address & PAGE_MASK), size - position)
+                    chunk = view[position:position + length]
+                    if chunk != _ZERO_PAGE[:length] or self._find(address >> PAGE_BITS) is not None:
+                        self._page(address >> PAGE_BITS)[address & PAGE_MASK:(address & PAGE_MASK) + length] = chunk
+                    chunk.release()
+                    position += length
+
+    def save(self, path: str, base: Optional[int] = None, size: Optional[int] = None):
+        """
+        Write the range starting at base as a RAM dump, through a writable map of the file. By default the range spans
+        the allocated pages, from the first to the end of the last one.
+        """
+        pages = self._visible()
+        if base is None:
+            base = min(pages, default=0) << PAGE_BITS
+        if size is None:
+            size = ((max(pages) + 1) << PAGE_BITS) - base if pages else 0
+        self._check(base, size)
+        with open(path, 'w+b') as file:
+            file.truncate(size)
+            if size == 0:
+                return
+            with mmap.mmap(file.fileno(), size) as buffer:
+                for number, page in pages.items():
+                    start = max(number << PAGE_BITS, base)
+                    end = min((number + 1) << PAGE_BITS, base + size)
+                    if start < end:
+                        index = start & PAGE_MASK
+                        buffer[start - base:end - base] = memoryview(page)[index:index + end - start]
+                buffer.flush()
+
+    def _read(self, address: int, size: int) -> bytearray:
+        self._check(address, size)
+        result = bytearray(size)
+        position = 0
+        while position < size:
+            index = address & PAGE_MASK
+            length = min(PAGE_SIZE - index, size - position)
+            page = self.pages.get(address >> PAGE_BITS) or self._shared(address >> PAGE_BITS)
+            if page is not None:
+                result[position:position + length] = memoryview(page)[index:index + length]
+            position += length
+            address += length
+        return result
+
+    def _page(self, number: int) -> bytearray:
+        """The page to write to, copied from the snapshot or allocated first if needed."""
+        page = self.pages.get(number)
+        if page is None:
+            shared = self._shared(number)
+            page = self.pages[number] = bytearray(PAGE_SIZE) if shared is None else bytearray(shared)
+        return page
+
+    def _find(self, number: int) -> Optional[bytearray]:
+        return self.pages.get(number) or self._shared(number)
+
+    def _shared(self, number: int) -> Optional[bytearray]:
+        snapshot = self.parent
+        while snapshot is not None:
+            page = snapshot.pages.get(number)
+            if page is not None:
+                return page
+            snapshot = snapshot.parent
+        return None
+
+    def _visible(self) -> Dict[int, bytearray]:
+        if self.parent is None:
+            return self.pages
+        pages = dict(self.parent._visible())
+        pages.update(self.pages)
+        return pages
+
+    @staticmethod
+    def _check(address: int, size: int):
+        if address < 0 or address + size > ADDRESS_SPACE:
+            raise Exception(f"Address 0x{address:08X} (+{size}) is outside of the 32-bit address space.")
+
+
+class Snapshot:
+    """
+    The frozen contents of a PagedMemory: the pages written since the previous snapshot (parent) and never modified
+    again. Chains are flattened every MAX_DEPTH snapshots to bound the cost of looking up a page.
+    """
+    __slots__ = ('pages', 'parent', 'depth')
+    MAX_DEPTH = 16
+
+    pages: Dict[int, bytearray]
+    parent: Optional['Snapshot']
+    depth: int
+
+    def __init__(self, pages: Dict[int, bytearray], parent: 'Snapshot' = None):
+        self.pages = pages
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+        if self.depth >= self.MAX_DEPTH:
+            self.pages = self._visible()
+            self.parent = None
+            self.depth = 0
+
+    def diff(self, other: Union['Snapshot', PagedMemory]) -> List[Tuple[int, int]]:
+        """The (start, end) address ranges, end exclusive, in which the contents differ from other."""
+        return _diff(self._visible(), other._visible())
+
+    def _visible(self) -> Dict[int, bytearray]:
+        if self.parent is None:
+            return self.pages
+        pages = dict(self.parent._visible())
+        pages.update(self.pages)
+        return pages
+
+
+def _diff(pages: Dict[int, bytearray], others: Dict[int, bytearray]) -> List[Tuple[int, int]]:
+    # Shared pages are the same objects and skipped without comparing, missing pages read as zero
+    ranges = []
+    for number in sorted(pages.keys() | others.keys()):
+        page = pages.get(number, _ZERO_PAGE)
+        other = others.get(number, _ZERO_PAGE)
+        if page is other or page == other:
+            continue
+        # The runs of non-zero bytes in the XOR of both pages are the changed ranges, found by the regex engine
+        changes = (int.from_bytes(page, 'little') ^ int.from_bytes(other, 'little')).to_bytes(PAGE_SIZE, 'little')
+        base = number << PAGE_BITS
+        for run in _CHANGED.finditer(changes):
+            start, end = base + run.start(), base + run.end()
+            if ranges and ranges[-1][1] == start:  # Continues the last range of the previous page
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+    return ranges
+
+
+_ZERO_PAGE = bytes(PAGE_SIZE)
+_CHANGED = re.compile(rb"[^\x00]+")
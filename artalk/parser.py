@@ -1,95 +1,241 @@
+import mmap
+import os
 import re
-from typing import List, Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Iterator, NamedTuple, Iterable, Union, Tuple, Callable
 
 from artalk.codeblocks import Block, Patch, WWrite, SWrite, BWrite, WGreaterThan, WLessThan, \
     WEqualTo, WNotEqualTo, SGreaterThan, SLessThan, SEqualTo, SNotEqualTo, LoadOffset, Repeat, \
     ConditionEnd, RepetitionEnd, Reset, SetOffset1, AddToDxData, SetDxData, DxDataWordWrite, DxDataShortWrite, \
     DxDataByteWrite, DxDataWordRead, DxDataShortRead, DxDataByteRead, AddToOffset, WaitForButton, Memory
+from artalk.compiler import compile_code
+from artalk.flow import Node, build
+from artalk.stats import ParseStats
+
+
+class BlockCache:
+    """
+    Bounded LRU of shared blocks keyed by their two words. Blocks are immutable, so one instance can be reused.
+    The cache may be shared between threads.
+    """
+    size: int
+    hits: int
+    misses: int
+
+    def __init__(self, size: int = 65536):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.blocks = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, words: Tuple[int, int]) -> Optional[Block]:
+        with self.lock:
+            block = self.blocks.get(words)
+            if block is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.blocks.move_to_end(words)
+            return block
+
+    def put(self, words: Tuple[int, int], block: Block):
+        with self.lock:
+            self.blocks[words] = block
+            if len(self.blocks) > self.size:
+                self.blocks.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.blocks.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self.blocks)
 
 
 class BlockFactory:
     BLOCK = r"([0-9A-F]{8})\s*([0-9A-F]{8})"
+    BLOCK_PATTERN = re.compile(BLOCK)
 
-    def can_create_block_from(self, line: str) -> Block:
-        line = line.strip().upper()
-        return re.compile(self.BLOCK).match(line.strip()) is not None
+    cache: Optional[BlockCache]
+    stats: Optional[ParseStats]
+
+    def __init__(self, cache: BlockCache = None, stats: ParseStats = None):
+        self.cache = cache
+        self.stats = stats
+        if stats is not None:  # Swap in the measuring variants so an uninstrumented factory pays nothing
+            self.create_words = self._create_measured
+            self._parse = self._parse_measured
+
+    def can_create_block_from(self, line: str) -> bool:
+        return self.BLOCK_PATTERN.match(line.strip().upper()) is not None
 
     def create_block(self, line: str, previous: Block = None) -> Optional[Block]:
         line = line.strip().upper()
-        mtch = re.compile(self.BLOCK).match(line)
-        first = mtch.group(1)
-        second = mtch.group(2)
+        mtch = self.BLOCK_PATTERN.match(line)
+        return self.create(mtch.group(1), mtch.group(2), previous)
+
+    def create(self, first: str, second: str, previous: Block = None) -> Optional[Block]:
+        """Create a block from two hex words."""
+        return self.create_words(int(first, 16), int(second, 16), previous)
+
+    def create_words(self, first: int, second: int, previous: Block = None) -> Optional[Block]:
         if type(previous) == Patch and len(previous.bytes) < previous.value:
-            remainder = previous.consume(first + second)
+            remainder = previous.consume_words(first, second).hex().upper()
             if remainder.strip("0F") != "":  # Done reading bytes but the remainder isn't 0's or F's
                 print(f"Remaining bytes after patch: {remainder}")
             return None
-        possible_blocks = [
-            WWrite,
-            SWrite,
-            BWrite,
-            WLessThan,
-            WGreaterThan,
-            WEqualTo,
-            WNotEqualTo,
-            SGreaterThan,
-            SLessThan,
-            SEqualTo,
-            SNotEqualTo,
-            LoadOffset,
-            Repeat,
-            ConditionEnd,
-            RepetitionEnd,
-            Reset,
-            SetOffset1,
-            AddToDxData,
-            SetDxData,
-            DxDataWordWrite,
-            DxDataShortWrite,
-            DxDataByteWrite,
-            DxDataWordRead,
-            DxDataShortRead,
-            DxDataByteRead,
-            AddToOffset,
-            WaitForButton,
-            Patch,
-            Memory
-        ]
-        for block in possible_blocks:
-            obj = block.parse(first, second)
+        cache = self.cache
+        if cache is not None and first >> 28 != 0xE:  # Patches collect their payload and can't be shared
+            words = (first, second)
+            obj = cache.get(words)
+            if obj is None:
+                obj = self._parse(first, second)
+                cache.put(words, obj)
+            return obj
+        return self._parse(first, second)
+
+    @staticmethod
+    def _parse(first: int, second: int) -> Block:
+        block = Block.block_type(first)
+        if block is not None:
+            obj = block.parse_words(first, second)
             if obj is not None:
                 return obj
-        raise Exception(f"No matching block pattern found: \"{line}\"")
+        raise Exception(f"No matching block pattern found: \"{first:08X} {second:08X}\"")
+
+    def _create_measured(self, first: int, second: int, previous: Block = None) -> Optional[Block]:
+        block = BlockFactory.create_words(self, first, second, previous)
+        self.stats.record_line(type(previous if block is None else block).__name__)
+        return block
+
+    def _parse_measured(self, first: int, second: int) -> Block:
+        block = Block.block_type(first)
+        name = ParseStats.UNKNOWN if block is None else block.__name__
+        start = time.perf_counter()
+        obj = None if block is None else block.parse_words(first, second)
+        self.stats.record_parse(name, time.perf_counter() - start, obj is None)
+        if obj is None:
+            raise Exception(f"No matching block pattern found: \"{first:08X} {second:08X}\"")
+        return obj
+
+
+class Token(NamedTuple):
+    line: int
+    title: Optional[str] = None
+    first: Optional[int] = None
+    second: Optional[int] = None
+    text: Optional[str] = None
+
+
+class Tokenizer:
+    # One line per match: a title, a block or any other non-blank text. Blank lines match none of the groups.
+    LINE = r"[^\S\r\n]*(?:\[(?P<title>[^\r\n]+)\]|(?P<first>[0-9A-Fa-f]{8})[^\S\r\n]*(?P<second>[0-9A-Fa-f]{8})" \
+           r"|(?P<text>\S))?[^\r\n]*(?:\r\n|\r|\n)?"
+    LINE_PATTERN = re.compile(LINE)
+    LINE_BYTES_PATTERN = re.compile(LINE.encode('ascii'))
+
+    def tokenize(self, string: str, start: int = 1) -> Iterator[Token]:
+        """Scan the whole document once and yield a token for every non-blank line, numbered from start."""
+        for number, mtch in enumerate(self.LINE_PATTERN.finditer(string), start):
+            token = self._token(number, mtch)
+            if token is not None:
+                yield token
+
+    def tokenize_lines(self, lines: Iterable[Union[str, bytes]]) -> Iterator[Token]:
+        """Tokenize line by line, e.g. straight from a text or binary file object. Binary lines are UTF-8."""
+        for number, line in enumerate(lines, 1):
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            token = self._token(number, self.LINE_PATTERN.match(line))
+            if token is not None:
+                yield token
+
+    def tokenize_bytes(self, buffer) -> Iterator[Token]:
+        """
+        Scan a bytes-like object (e.g. an mmap) without decoding it first. The matched words are converted to ints
+        straight from the bytes; only titles (UTF-8) and unexpected text are turned into strings.
+        """
+        for number, mtch in enumerate(self.LINE_BYTES_PATTERN.finditer(buffer), 1):
+            title, first, second, text = mtch.group('title', 'first', 'second', 'text')
+            if first is not None:
+                yield Token(number, first=int(first, 16), second=int(second, 16))
+            elif title is not None:
+                yield Token(number, title=title.decode('utf-8'))
+            elif text is not None:
+                yield Token(number, text=mtch.group(0).strip().decode('utf-8', 'replace'))
+
+    @classmethod
+    def _token(cls, number: int, mtch) -> Optional[Token]:
+        title, first, second, text = mtch.group('title', 'first', 'second', 'text')
+        if first is not None:
+            return Token(number, first=int(first, 16), second=int(second, 16))
+        if title is not None:
+            return Token(number, title=title)
+        if text is not None:
+            return Token(number, text=mtch.group(0).strip())
+        return None
 
 
 class Code:
     CODE_HEAD = r"\[(.+)\]"
+    CODE_HEAD_PATTERN = re.compile(CODE_HEAD)
 
     title: str
     blocks: List[Block]
+    line_numbers: List[int]
     factory: BlockFactory
 
-    def __init__(self, line: str = ""):
+    def __init__(self, line: str = "", title: str = "", factory: BlockFactory = None):
         self.blocks = []
-        self.title = ""
-        self.factory = BlockFactory()
+        self.line_numbers = []  # Source line of each block, if it was parsed from text
+        self.title = title
+        self._flow = None
+        self._flow_blocks = None
+        self.factory = factory if factory is not None else BlockFactory()
         if line != "":
-            self.title = re.compile(self.CODE_HEAD).match(line.strip()).group(1)
+            self.title = self.CODE_HEAD_PATTERN.match(line.strip()).group(1)
 
     def parse_block(self, line: str) -> Block:
         if not self.factory.can_create_block_from(line):
             raise Exception(f"Line doesn't match expected code block layout: \"{line}\"")
+        mtch = self.factory.BLOCK_PATTERN.match(line.strip().upper())
+        return self.add_block(mtch.group(1), mtch.group(2))
+
+    def add_block(self, first: str, second: str, line: int = None) -> Optional[Block]:
+        return self.add_words(int(first, 16), int(second, 16), line)
+
+    def add_words(self, first: int, second: int, line: int = None) -> Optional[Block]:
         previous = None
         if len(self.blocks) > 0:
             previous = self.blocks[-1]
-        block = self.factory.create_block(line, previous)
+        block = self.factory.create_words(first, second, previous)
         if block is not None:
             self.blocks.append(block)
+            if line is not None:
+                self.line_numbers.append(line)
         return block
 
+    def flow(self) -> Node:
+        """The blocks nested into conditions, loops and button checks (see artalk.flow). Rebuilt if blocks changed."""
+        blocks = tuple(self.blocks)
+        if self._flow is None or self._flow_blocks != blocks:
+            self._flow = build(blocks, self.line_numbers)
+            self._flow_blocks = blocks
+        return self._flow
+
+    def compile(self) -> Callable[[object, int], Tuple[int, int]]:
+        """This code as a Python function of (memory, buttons) (see artalk.compiler). Recompiled if blocks changed."""
+        return compile_code(self)
+
     @classmethod
     def is_title(cls, line: str) -> bool:
-        return re.compile(cls.CODE_HEAD).match(line.strip()) is not None
+        return cls.CODE_HEAD_PATTERN.match(line.strip()) is not None
 
     def __str__(self):
         if self.title != "":
@@ -97,26 +243,125 @@ class Code:
         return super(Code, self).__str__()
 
 
+def _parse_chunk(chunk: Tuple[str, int, bool]) -> Tuple[List[Code], Optional[ParseStats]]:
+    string, start, instrumented = chunk
+    parser = Parser(stats=ParseStats() if instrumented else None)
+    return parser.parse(string, start), parser.stats
+
+
 class Parser:
-    codes: List[Code]
+    """
+    Reentrant: a parser keeps no state between calls, so one instance can parse many documents at once from several
+    threads. Every call builds fresh codes; only the blocks of a shared BlockCache are reused between them.
+    """
+    TITLE_START = re.compile(r"^[^\S\r\n]*\[[^\r\n]+\]", re.MULTILINE)
+
+    factory: BlockFactory
+    stats: Optional[ParseStats]
+
+    def __init__(self, cache: BlockCache = None, stats: ParseStats = None):
+        """
+        Blocks are shared through the given cache, if any, across all documents parsed by this parser. Counters are
+        collected in stats, if given.
+        """
+        self.factory = BlockFactory(cache, stats)
+        self.stats = stats
 
-    def parse(self, string: str) -> List[Code]:
-        self.codes = []
+    def parse(self, string: str, start: int = 1) -> List[Code]:
+        return list(self._run(Tokenizer().tokenize(string, start)))
+
+    def parse_parallel(self, string: str, workers: int = None, chunks: int = None) -> List[Code]:
+        """
+        Parse in a process pool. The document is split into roughly equally sized chunks at title lines, which no
+        code (including E-type patch payloads) can span, and the codes are returned in document order.
+        """
+        if chunks is None:
+            chunks = 4 * (workers or os.cpu_count() or 1)
+        parts = self.split(string, chunks)
+        if len(parts) <= 1:
+            return self.parse(string)
+        instrumented = self.stats is not None
+        codes = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk_codes, stats in executor.map(_parse_chunk, [part + (instrumented,) for part in parts]):
+                codes.extend(chunk_codes)
+                if instrumented:
+                    self.stats.merge(stats)
+        return codes
+
+    @classmethod
+    def split(cls, string: str, chunks: int) -> List[Tuple[str, int]]:
+        """Split a document at title lines into about the given number of (text, first line number) chunks."""
+        size = max(1, len(string) // max(1, chunks))
+        parts = []
+        begin = 0
+        line = 1
+        for mtch in cls.TITLE_START.finditer(string):
+            end = mtch.start()
+            if end - begin >= size:
+                parts.append((string[begin:end], line))
+                line += string.count("\n", begin, end)
+                begin = end
+        parts.append((string[begin:], line))
+        return parts
+
+    def iter_parse(self, file: Iterable[Union[str, bytes]]) -> Iterator[Code]:
+        """
+        Parse a text or binary file object lazily. Each code is yielded as soon as the next title (or the end of the
+        file) closes it, so only one code is held in memory at a time.
+        """
+        return self._run(Tokenizer().tokenize_lines(file))
+
+    def parse_file(self, path: str) -> List[Code]:
+        """Parse a file by memory-mapping it and tokenizing the raw bytes, skipping the decode and line split copies."""
+        with open(path, 'rb') as file:
+            if file.seek(0, 2) == 0:
+                return []
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                tokens = Tokenizer().tokenize_bytes(buffer)
+                try:
+                    return list(self._run(tokens))
+                finally:
+                    tokens.close()  # Drop the scanner's last match, which keeps the map exported, before closing it
+
+    def _run(self, tokens: Iterator[Token]) -> Iterator[Code]:
+        if self.stats is None:
+            return self._build(tokens, self.factory)
+        return self._run_measured(tokens)
+
+    def _run_measured(self, tokens: Iterator[Token]) -> Iterator[Code]:
+        # Only the time spent producing codes counts, not the time the caller spends between them
+        lines = [0]
+
+        def counted():
+            for token in tokens:
+                lines[0] += 1
+                yield token
+
+        codes = self._build(counted(), self.factory)
+        seconds = 0.0
+        while True:
+            begin = time.perf_counter()
+            code = next(codes, None)
+            seconds += time.perf_counter() - begin
+            if code is None:
+                break
+            yield code
+        self.stats.record_run(lines[0], seconds)
+
+    @staticmethod
+    def _build(tokens: Iterator[Token], factory: BlockFactory) -> Iterator[Code]:
         code = None
-        for line in string.splitlines():
-            line = line.strip()
-            if len(self.codes) == 0:  # Look for first code
-                if Code.is_title(line):
-                    code = Code(line)
-                    self.codes.append(code)
-                continue
-            if len(line) != 0 and len(code.blocks) == 0:  # Title read, no blocks yet
-                code.parse_block(line)
+        for token in tokens:
+            if token.title is not None:  # New code encountered
+                if code is not None:
+                    yield code
+                code = Code(title=token.title, factory=factory)
+            elif code is None:  # Look for first code
                 continue
-            if len(line) != 0:  # Title and at least one block read
-                if Code.is_title(line):  # New code encountered
-                    code = Code(line)
-                    self.codes.append(code)
-                else:  # Still reading code blocks
-                    code.parse_block(line)
-        return self.codes
+            elif token.first is not None:  # Still reading code blocks
+                code.add_words(token.first, token.second, token.line)
+            else:
+                raise Exception(f"Line {token.line} doesn't match expected code block layout: \"{token.text}\"")
+        if code is not None:
+            yield code
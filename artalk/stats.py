@@ -0,0 +1,113 @@
+import threading
+from typing import Dict
+
+
+class BlockStats:
+    """Counters of one block type."""
+    __slots__ = ('lines', 'seconds', 'failures', 'bytes')
+
+    def __init__(self):
+        self.lines = 0
+        self.seconds = 0.0
+        self.failures = 0
+        self.bytes = 0
+
+
+class ParseStats:
+    """
+    Counters collected by an instrumented BlockFactory/Parser, per block type and for the whole run. Lines are
+    counted for the type that consumed them (payload lines count towards Patch); bytes are code data, 8 per line.
+    Time per type is spent in the type's parse(); failures are parse() calls that rejected their words. The run
+    totals count the non-blank lines of every parsed document.
+    """
+    UNKNOWN = "Unknown"
+
+    blocks: Dict[str, BlockStats]
+    runs: int
+    lines: int
+    seconds: float
+
+    def __init__(self):
+        self.blocks = {}
+        self.runs = 0
+        self.lines = 0
+        self.seconds = 0.0
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        # Sent back from worker processes by Parser.parse_parallel; the lock stays behind
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def block(self, name: str) -> BlockStats:
+        stats = self.blocks.get(name)
+        if stats is None:
+            stats = self.blocks.setdefault(name, BlockStats())
+        return stats
+
+    def record_line(self, name: str):
+        with self.lock:
+            stats = self.block(name)
+            stats.lines += 1
+            stats.bytes += 8
+
+    def record_parse(self, name: str, seconds: float, failed: bool):
+        with self.lock:
+            stats = self.block(name)
+            stats.seconds += seconds
+            if failed:
+                stats.failures += 1
+
+    def record_run(self, lines: int, seconds: float):
+        with self.lock:
+            self.runs += 1
+            self.lines += lines
+            self.seconds += seconds
+
+    def merge(self, other: 'ParseStats'):
+        with self.lock:
+            for name, theirs in other.blocks.items():
+                stats = self.block(name)
+                stats.lines += theirs.lines
+                stats.seconds += theirs.seconds
+                stats.failures += theirs.failures
+                stats.bytes += theirs.bytes
+            self.runs += other.runs
+            self.lines += other.lines
+            self.seconds += other.seconds
+
+    @property
+    def lines_per_second(self) -> float:
+        return self.lines / self.seconds if self.seconds > 0 else 0.0
+
+    def to_prometheus(self, prefix: str = "artalk") -> str:
+        """The counters in the Prometheus text exposition format."""
+        out = []
+
+        def metric(name: str, kind: str, text: str, samples):
+            out.append(f"# HELP {prefix}_{name} {text}")
+            out.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in samples:
+                out.append(f"{prefix}_{name}{labels} {value}")
+
+        with self.lock:
+            blocks = sorted(self.blocks.items())
+            metric("block_lines_total", "counter", "Lines parsed per block type.",
+                   [(f'{{type="{name}"}}', stats.lines) for name, stats in blocks])
+            metric("block_parse_seconds_total", "counter", "Time spent in parse() per block type.",
+                   [(f'{{type="{name}"}}', repr(stats.seconds)) for name, stats in blocks])
+            metric("block_failed_probes_total", "counter", "parse() calls that rejected their words per block type.",
+                   [(f'{{type="{name}"}}', stats.failures) for name, stats in blocks])
+            metric("block_bytes_total", "counter", "Code bytes processed per block type.",
+                   [(f'{{type="{name}"}}', stats.bytes) for name, stats in blocks])
+            metric("runs_total", "counter", "Documents parsed.", [("", self.runs)])
+            metric("lines_total", "counter", "Document lines parsed.", [("", self.lines)])
+            metric("seconds_total", "counter", "Time spent parsing documents.", [("", repr(self.seconds))])
+            metric("lines_per_second", "gauge", "Lines parsed per second over all runs.",
+                   [("", repr(self.lines_per_second))])
+        return "\n".join(out) + "\n"
@@ -0,0 +1,233 @@
+import operator
+import weakref
+from typing import List, Tuple, Callable, Dict, Any, Union
+
+from artalk.codeblocks import Block, WWrite, SWrite, BWrite, Conditional32bitCodes, Conditional16bitCodes, \
+    Conditions, LoadOffset, SetOffset1, AddToOffset, Repeat, ConditionEnd, RepetitionEnd, Reset, AddToDxData, \
+    SetDxData, DxDataWordWrite, DxDataShortWrite, DxDataByteWrite, DxDataWordRead, DxDataShortRead, DxDataByteRead, \
+    WaitForButton, Patch, Memory
+from artalk.flow import Node, LoopNode
+from artalk.memory import MemoryImage, PagedMemory
+from artalk.parser import Code
+
+MASK = 0xFFFFFFFF
+COMPARISONS = {
+    Conditions.GREATERTHAN: operator.gt,
+    Conditions.LESSTHAN: operator.lt,
+    Conditions.EQUALTO: operator.eq,
+    Conditions.NOTEQUALTO: operator.ne,
+}
+
+# (handler, a, b, c, target): the operands are taken from the block ahead of time; target is the instruction to
+# continue with when a condition fails or a loop is skipped, and the loop body for RepetitionEnd.
+Instruction = Tuple[Callable, Any, Any, Any, int]
+
+
+class Machine:
+    """
+    Executes codes against a memory image or paged memory (see artalk.memory), with the semantics the blocks
+    describe in to_human_readable: conditionals compare their value against memory ("value OP [address + offset]"),
+    C0 repeats its body the given number of times and D1 adds its value to the offset after every pass, D6-D8 load
+    DxData from memory, D9-DB store it and advance the offset, and F copies from the offset to its address. Every run
+    starts with cleared registers. buttons is the input state checked by WaitForButton and can be changed between runs.
+    """
+    memory: Union[MemoryImage, PagedMemory]
+    buttons: int
+    offset: int
+    dxdata: int
+
+    def __init__(self, memory: Union[MemoryImage, PagedMemory], buttons: int = 0):
+        self.memory = memory
+        self.buttons = buttons
+        self.offset = 0
+        self.dxdata = 0
+        self._loops = []
+        self._programs = weakref.WeakKeyDictionary()  # Code -> (blocks, instructions)
+
+    def run(self, code: Code):
+        program = self.program(code)
+        self.offset = 0
+        self.dxdata = 0
+        self._loops.clear()
+        pc = 0
+        end = len(program)
+        while pc < end:
+            handler, a, b, c, target = program[pc]
+            pc = handler(self, pc, a, b, c, target)
+
+    def program(self, code: Code) -> List[Instruction]:
+        """The instructions of a code, translated once and kept until its blocks change."""
+        blocks = tuple(code.blocks)
+        entry = self._programs.get(code)
+        if entry is None or entry[0] != blocks:
+            entry = (blocks, self.compile(code))
+            self._programs[code] = entry
+        return entry[1]
+
+    @classmethod
+    def compile(cls, code: Code) -> List[Instruction]:
+        blocks = code.blocks
+        targets = [0] * len(blocks)
+        cls._jumps(code.flow(), targets)  # Raises on unbalanced blocks
+        program = []
+        for block, target in zip(blocks, targets):
+            translate = cls.TRANSLATIONS.get(type(block))
+            if translate is None:
+                raise Exception(f"Can't execute {type(block).__name__}: \"{block.first} {block.second}\"")
+            program.append(translate(block) + (target,))
+        return program
+
+    @classmethod
+    def _jumps(cls, node: Node, targets: List[int]) -> int:
+        """
+        Fill in the jump targets of node and the nodes inside it and return the index of the first block after it. A
+        node closed by a Reset (or the end of the code) jumps to that Reset, RepetitionEnd back to the loop body.
+        """
+        position = 0 if node.block is None else node.index + 1
+        for child in node.children:
+            position = cls._jumps(child, targets) if isinstance(child, Node) else position + 1
+        if node.end is not None:
+            position = node.end_index + 1
+            if type(node) == LoopNode:
+                targets[node.end_index] = node.index + 1
+        if node.block is not None:
+            targets[node.index] = position
+        return position
+
+    def _write32(self, pc, address, value, _, target):
+        self.memory.write32((address + self.offset) & MASK, value)
+        return pc + 1
+
+    def _write16(self, pc, address, value, _, target):
+        self.memory.write16((address + self.offset) & MASK, value)
+        return pc + 1
+
+    def _write8(self, pc, address, value, _, target):
+        self.memory.write8((address + self.offset) & MASK, value)
+        return pc + 1
+
+    def _if32(self, pc, address, value, compare, target):
+        if compare(value, self.memory.read32((address + self.offset) & MASK)):
+            return pc + 1
+        return target
+
+    def _if16(self, pc, address, value, compare_mask, target):
+        compare, mask = compare_mask
+        if compare(value, self.memory.read16((address + self.offset) & MASK) & ~mask):
+            return pc + 1
+        return target
+
+    def _if_buttons(self, pc, buttons, _, __, target):
+        if self.buttons & buttons == buttons:
+            return pc + 1
+        return target
+
+    def _end_if(self, pc, _, __, ___, target):
+        return pc + 1
+
+    def _repeat(self, pc, count, _, __, target):
+        if count == 0:
+            return target
+        self._loops.append([count - 1, pc + 1])
+        return pc + 1
+
+    def _end_repeat(self, pc, step, _, __, target):
+        self.offset = (self.offset + step) & MASK
+        loop = self._loops[-1]
+        if loop[0] > 0:
+            loop[0] -= 1
+            return loop[1]
+        self._loops.pop()
+        return pc + 1
+
+    def _reset(self, pc, _, __, ___, target):
+        self.offset = 0
+        self.dxdata = 0
+        self._loops.clear()
+        return pc + 1
+
+    def _load_offset(self, pc, address, _, __, target):
+        self.offset = self.memory.read32((address + self.offset) & MASK)
+        return pc + 1
+
+    def _set_offset(self, pc, value, _, __, target):
+        self.offset = value
+        return pc + 1
+
+    def _add_offset(self, pc, value, _, __, target):
+        self.offset = (self.offset + value) & MASK
+        return pc + 1
+
+    def _set_dxdata(self, pc, value, _, __, target):
+        self.dxdata = value
+        return pc + 1
+
+    def _add_dxdata(self, pc, value, _, __, target):
+        self.dxdata = (self.dxdata + value) & MASK
+        return pc + 1
+
+    def _load32(self, pc, address, _, __, target):
+        self.dxdata = self.memory.read32((address + self.offset) & MASK)
+        return pc + 1
+
+    def _load16(self, pc, address, _, __, target):
+        self.dxdata = self.memory.read16((address + self.offset) & MASK)
+        return pc + 1
+
+    def _load8(self, pc, address, _, __, target):
+        self.dxdata = self.memory.read8((address + self.offset) & MASK)
+        return pc + 1
+
+    def _store32(self, pc, address, _, __, target):
+        self.memory.write32((address + self.offset) & MASK, self.dxdata)
+        self.offset = (self.offset + 4) & MASK
+        return pc + 1
+
+    def _store16(self, pc, address, _, __, target):
+        self.memory.write16((address + self.offset) & MASK, self.dxdata)
+        self.offset = (self.offset + 2) & MASK
+        return pc + 1
+
+    def _store8(self, pc, address, _, __, target):
+        self.memory.write8((address + self.offset) & MASK, self.dxdata)
+        self.offset = (self.offset + 1) & MASK
+        return pc + 1
+
+    def _patch(self, pc, address, payload, _, target):
+        self.memory.write((address + self.offset) & MASK, payload)
+        return pc + 1
+
+    def _copy(self, pc, address, size, _, target):
+        self.memory.copy(address, self.offset, size)
+        return pc + 1
+
+    # Per block type: the handler and the operands it needs
+    TRANSLATIONS: Dict[type, Callable[[Block], tuple]] = {
+        WWrite: lambda block: (Machine._write32, block.address, block.value, None),
+        SWrite: lambda block: (Machine._write16, block.address, block.value, None),
+        BWrite: lambda block: (Machine._write8, block.address, block.value, None),
+        LoadOffset: lambda block: (Machine._load_offset, block.address, None, None),
+        Repeat: lambda block: (Machine._repeat, block.value, None, None),
+        ConditionEnd: lambda block: (Machine._end_if, None, None, None),
+        RepetitionEnd: lambda block: (Machine._end_repeat, block.value, None, None),
+        Reset: lambda block: (Machine._reset, None, None, None),
+        SetOffset1: lambda block: (Machine._set_offset, block.value, None, None),
+        AddToOffset: lambda block: (Machine._add_offset, block.value, None, None),
+        AddToDxData: lambda block: (Machine._add_dxdata, block.value, None, None),
+        SetDxData: lambda block: (Machine._set_dxdata, block.value, None, None),
+        DxDataWordWrite: lambda block: (Machine._load32, block.address, None, None),
+        DxDataShortWrite: lambda block: (Machine._load16, block.address, None, None),
+        DxDataByteWrite: lambda block: (Machine._load8, block.address, None, None),
+        DxDataWordRead: lambda block: (Machine._store32, block.address, None, None),
+        DxDataShortRead: lambda block: (Machine._store16, block.address, None, None),
+        DxDataByteRead: lambda block: (Machine._store8, block.address, None, None),
+        WaitForButton: lambda block: (Machine._if_buttons, block.value, None, None),
+        Patch: lambda block: (Machine._patch, block.address, bytes(block.bytes), None),
+        Memory: lambda block: (Machine._copy, block.address, block.value, None),
+    }
+    for _block in Conditional32bitCodes.__subclasses__():
+        TRANSLATIONS[_block] = lambda block: (Machine._if32, block.address, block.value, COMPARISONS[block.condition])
+    for _block in Conditional16bitCodes.__subclasses__():
+        TRANSLATIONS[_block] = lambda block: (Machine._if16, block.address, block.value,
+                                              (COMPARISONS[block.condition], block.mask))
+    del _block
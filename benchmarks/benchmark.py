@@ -0,0 +1,130 @@
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import List, Dict, Callable
+
+from artalk.codeblocks import Block
+from artalk.generator import Generator
+from artalk.memory import MemoryImage
+from artalk.parser import Parser, BlockFactory
+from artalk.vm import Machine
+
+# Run from the repository root: python -m benchmarks.benchmark --sizes 1000 100000 --output results.json
+#
+# Every benchmark is named "<name>/<lines>" and records the best of a few runs. Comparing against a baseline flags
+# every benchmark that got slower by more than the tolerance and exits with status 1.
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+REPEAT = 3
+TOLERANCE = 0.2
+
+
+def make_document(lines: int, seed: int = 0) -> str:
+    """A document of whole codes with at least the given number of lines and a realistic opcode mix."""
+    return Generator(seed).document(lines)
+
+
+def measure(function: Callable[[], object], repeat: int = REPEAT) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes: List[int], repeat: int = REPEAT, seed: int = 0) -> Dict[str, Dict[str, float]]:
+    results = {}
+
+    def record(name: str, lines: int, seconds: float, operations: int):
+        results[f"{name}/{lines}"] = {
+            "seconds": seconds,
+            "ns_per_op": seconds * 1e9 / max(1, operations),
+        }
+
+    for lines in sizes:
+        document = make_document(lines, seed)
+        block_lines = [line for line in document.splitlines() if line and line[0] != "["]
+        record("parse", lines, measure(lambda: Parser().parse(document), repeat), document.count("\n"))
+
+        def create_blocks():
+            factory = BlockFactory()
+            previous = None
+            for line in block_lines:
+                block = factory.create_block(line, previous)
+                if block is not None:
+                    previous = block
+
+        record("create_block", lines, measure(create_blocks, repeat), len(block_lines))
+
+        blocks = [block for code in Parser().parse(document) for block in code.blocks]
+        record("to_human_readable", lines,
+               measure(lambda: [block.to_human_readable() for block in blocks], repeat), len(blocks))
+        record("to_c", lines, measure(lambda: [block.to_c() for block in blocks], repeat), len(blocks))
+
+        by_type: Dict[type, List[Block]] = {}
+        for block in blocks:
+            by_type.setdefault(type(block), []).append(block)
+        for block_type, samples in sorted(by_type.items(), key=lambda item: item[0].__name__):
+            words = [(block.first, block.second) for block in samples]
+            record(f"parse.{block_type.__name__}", lines,
+                   measure(lambda: [block_type.parse(first, second) for first, second in words], repeat), len(words))
+
+        # A loop of conditionals and writes, run by the VM: five blocks per pass, one pass per line
+        loop = Parser().parse(f"[Loop]\nC0000000 {lines:08X}\n50001000 00000000\n00001004 12345678\n"
+                              f"D0000000 00000000\n10001008 00001234\nD1000000 00000000\n")[0]
+        machine = Machine(MemoryImage(0x2000))
+        record("vm.loop", lines, measure(lambda: machine.run(loop), repeat), 5 * lines)
+        function = loop.compile()
+        record("compiled.loop", lines, measure(lambda: function(machine.memory), repeat), 5 * lines)
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float = TOLERANCE) -> List[str]:
+    """Describe every benchmark that is more than tolerance (relative) slower than in the baseline."""
+    regressions = []
+    for name, result in sorted(results.items()):
+        reference = baseline.get(name)
+        if reference is None or reference["seconds"] <= 0:
+            continue
+        ratio = result["seconds"] / reference["seconds"]
+        if ratio > 1 + tolerance:
+            regressions.append(f"{name}: {result['seconds']:.4f}s vs. {reference['seconds']:.4f}s ({ratio:.2f}x)")
+    return regressions
+
+
+def main(args: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time the ARTalk parser and renderers on generated documents.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="document sizes in lines")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="runs per benchmark, the best one counts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against the results in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed relative slowdown")
+    options = parser.parse_args(args)
+
+    results = run(options.sizes, options.repeat, options.seed)
+    for name, result in results.items():
+        print(f"{name:40} {result['seconds']:10.4f}s {result['ns_per_op']:10.0f} ns/op")
+    if options.output is not None:
+        with open(options.output, 'w') as file:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            }, file, indent=2)
+    if options.baseline is not None:
+        with open(options.baseline, 'r') as file:
+            regressions = compare(results, json.load(file)["results"], options.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,134 @@
-from artalk.parser import Parser
+import argparse
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple, TextIO, Iterable
+
+from artalk.codeblocks import OutOfRangeError
+from artalk.parser import Parser, Code
+
+FORMATS = {
+    "human": ".readable.txt",
+    "c": ".c",
+}
+
+
+def write_codes(codes: Iterable[Code], output: TextIO, fmt: str = "human", comments: bool = False):
+    for code in codes:
+        if fmt == "c":
+            output.write(f"\n// {code.title}\n")
+            for block in code.blocks:
+                output.write(block.to_c(comments))
+                output.write("\n")
+        else:
+            output.write(f"\n[{code.title}]\n")
+            for block in code.blocks:
+                output.write(f"{block.first} {block.second}: {block.to_human_readable(comments)}\n")
+
+
+def output_path(path: str, output_dir: Optional[str], fmt: str) -> str:
+    name = os.path.splitext(os.path.basename(path))[0] + FORMATS[fmt]
+    return os.path.join(output_dir if output_dir is not None else os.path.dirname(path), name)
+
+
+def translate(job: Tuple[str, str, str, bool]) -> Optional[str]:
+    """Translate one file; returns the error message if it failed."""
+    path, output, fmt, comments = job
+    temporary = output + ".tmp"
+    try:
+        codes = Parser().parse_file(path)
+        with open(temporary, 'w', encoding='utf-8', buffering=1024 * 1024) as file:
+            write_codes(codes, file, fmt, comments)
+        os.replace(temporary, output)
+    except (Exception, OutOfRangeError) as e:  # OutOfRangeError is a BaseException and would kill the pool
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        return str(e)
+    return None
+
+
+def collisions(jobs: List[Tuple[str, str, str, bool]]) -> List[Tuple[str, str]]:
+    """
+    Inputs that would be translated to the same output file as another input, or onto one of the inputs, with the
+    error to report.
+    """
+    inputs = {os.path.normcase(os.path.abspath(path)) for path, _, _, _ in jobs}
+    writers = {}
+    for path, output, _, _ in jobs:
+        writers.setdefault(os.path.normcase(os.path.abspath(output)), []).append(path)
+    errors = []
+    for output, paths in writers.items():
+        if output in inputs:
+            errors.extend((path, f"Output {output} would overwrite an input") for path in paths)
+            continue
+        if len(paths) > 1:
+            errors.extend((path, f"Output {output} would also be written by " + ", ".join(
+                other for other in paths if other != path)) for path in paths)
+    return errors
+
+
+def expand(patterns: List[str]) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """
+    Resolve files and globs (** included) into a sorted list of distinct files, and the patterns matching none.
+    Outputs of this tool are left out, so that translating a directory twice doesn't translate the translations.
+    """
+    paths = []
+    errors = []
+    suffixes = tuple(FORMATS.values())
+    for pattern in patterns:
+        files = [path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path)]
+        matches = sorted(path for path in files if not path.endswith(suffixes))
+        if len(files) == 0:
+            errors.append((pattern, "No such file"))
+        elif len(matches) == 0:
+            errors.append((pattern, "Only matches translated outputs"))
+        paths.extend(matches)
+    return list(dict.fromkeys(paths)), errors
+
+
+def run(jobs: List[Tuple[str, str, str, bool]], workers: int = None) -> List[Optional[str]]:
+    if workers == 1 or len(jobs) <= 1:
+        return [translate(job) for job in jobs]
+    chunksize = max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(translate, jobs, chunksize=chunksize))
+
+
+def main(args: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Translate AR code files into readable text or C.")
+    parser.add_argument("inputs", nargs="*", help="code files or glob patterns; in.txt is printed if none are given")
+    parser.add_argument("-f", "--format", choices=sorted(FORMATS), default="human")
+    parser.add_argument("-o", "--output-dir", help="where to put the outputs, next to each input by default")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes, one per CPU by default")
+    parser.add_argument("-c", "--comments", action="store_true", help="annotate values with their decimal value")
+    options = parser.parse_args(args)
+
+    if not options.inputs:
+        with open('in.txt', 'r') as codefile:
+            write_codes(Parser().iter_parse(codefile), sys.stdout, options.format, options.comments)
+        return 0
+
+    paths, errors = expand(options.inputs)
+    if options.output_dir is not None:
+        os.makedirs(options.output_dir, exist_ok=True)
+    jobs = [(path, output_path(path, options.output_dir, options.format), options.format, options.comments)
+            for path in paths]
+    clashing = collisions(jobs)
+    errors.extend(clashing)
+    failed = len(clashing)
+    skipped = {path for path, _ in clashing}
+    jobs = [job for job in jobs if job[0] not in skipped]
+    for path, error in zip([job[0] for job in jobs], run(jobs, options.workers)):
+        if error is not None:
+            errors.append((path, error))
+            failed += 1
+
+    print(f"Translated {len(paths) - failed} of {len(paths)} files.", file=sys.stderr)
+    for path, error in errors:
+        print(f"{path}: {error}", file=sys.stderr)
+    return 1 if errors else 0
+
 
 if __name__ == '__main__':
-    with open('in.txt', 'r') as codefile:
-        content = codefile.read()
-    for code in Parser().parse(content):
-        print()
-        print(f"[{code.title}]")
-        for block in code.blocks:
-            print(f"{block.first} {block.second}: {block.to_human_readable()}")
+    sys.exit(main())
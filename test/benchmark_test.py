@@ -0,0 +1,34 @@
+import unittest
+
+from artalk.parser import Parser
+from benchmarks import benchmark
+
+
+class BenchmarkTest(unittest.TestCase):
+    def test_makeDocument(self):
+        document = benchmark.make_document(500, seed=1)
+        self.assertGreaterEqual(len(document.splitlines()), 500)
+        self.assertEqual(document, benchmark.make_document(500, seed=1))
+        codes = Parser().parse(document)
+        self.assertGreater(len(codes), 10)
+        for code in codes:
+            for block in code.blocks:
+                block.to_human_readable()
+                block.to_c()
+
+    def test_run(self):
+        results = benchmark.run([200], repeat=1)
+        for name in ("parse/200", "create_block/200", "to_human_readable/200", "to_c/200", "parse.WWrite/200"):
+            self.assertIn(name, results)
+            self.assertGreaterEqual(results[name]["seconds"], 0)
+
+    def test_compare(self):
+        baseline = {"parse/1000": {"seconds": 1.0}, "to_c/1000": {"seconds": 1.0}}
+        results = {"parse/1000": {"seconds": 1.1}, "to_c/1000": {"seconds": 1.5}, "new/1000": {"seconds": 9.0}}
+        regressions = benchmark.compare(results, baseline, tolerance=0.2)
+        self.assertEqual(1, len(regressions))
+        self.assertTrue(regressions[0].startswith("to_c/1000"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import io
+import unittest
+from artalk import binary
+from artalk.codeblocks import SetOffset2
+from artalk.parser import Parser, Code
+
+
+class BinaryTest(unittest.TestCase):
+    DOCUMENT = """
+[Pokémon Generator]
+D3000000 00000000
+01234567 89ABCDEF
+71234567 00FF0001
+DD000000 00000044
+D0000000 00000000
+
+[Patch]
+E0001000 0000000A
+01234567 89ABCDEF
+01234567 00000000
+D2000000 00000000
+
+[Empty]
+"""
+
+    def test_roundtrip(self):
+        codes = Parser().parse(self.DOCUMENT)
+        loaded = binary.loads(binary.dumps(codes))
+        self.assertEqual([code.title for code in codes], [code.title for code in loaded])
+        self.assertEqual([[(type(block), str(block)) for block in code.blocks] for code in codes],
+                         [[(type(block), str(block)) for block in code.blocks] for code in loaded])
+        self.assertEqual(codes[1].blocks[0].bytes, loaded[1].blocks[0].bytes)
+        self.assertEqual(["SELECT", "UP"], loaded[0].blocks[3].buttons)
+        self.assertEqual([code.line_numbers for code in codes], [code.line_numbers for code in loaded])
+        self.assertEqual([3, 4, 5, 6, 7], loaded[0].line_numbers)
+
+    def test_lineNumbers(self):
+        loaded = binary.loads(binary.dumps(Parser().parse("[A]\nD0000000 00000000\n")))
+        self.assertRaisesRegex(Exception, "Line 2", loaded[0].flow)
+
+    def test_dump_load(self):
+        codes = Parser().parse(self.DOCUMENT)
+        file = io.BytesIO()
+        binary.dump(codes, file)
+        self.assertEqual(0, len(file.getvalue()) % 4)
+        file.seek(0)
+        self.assertEqual(len(codes), len(binary.load(file)))
+
+    def test_empty(self):
+        self.assertListEqual([], binary.loads(binary.dumps([])))
+
+    def test_invalid(self):
+        data = bytearray(binary.dumps([]))
+        self.assertRaises(Exception, binary.loads, b"XXXX" + bytes(data[4:]))
+        data[4] = binary.VERSION + 1
+        self.assertRaises(Exception, binary.loads, bytes(data))
+
+    def test_invalidBlock(self):
+        data = bytearray(binary.dumps(Parser().parse("[A]\n11234567 00001234\n")))
+        data[data.index(b"\x34\x12\x00\x00") + 2] = 0xFF  # High half of the SWrite value
+        self.assertRaisesRegex(Exception, "No matching block pattern", binary.loads, bytes(data))
+
+    def test_dumpUnregistered(self):
+        code = Code(title="A")
+        code.blocks.append(SetOffset2(1))
+        self.assertRaises(Exception, binary.dumps, [code])
+
+
+if __name__ == '__main__':
+    unittest.main()
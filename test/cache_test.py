@@ -0,0 +1,67 @@
+import os
+import tempfile
+import time
+import unittest
+from artalk.cache import ParseCache
+
+
+class ParseCacheTest(unittest.TestCase):
+    DOCUMENT = "[Pokémon Generator]\nD3000000 00000000\n01234567 89ABCDEF\n\n[Infinite Money]\n21234567 00000089\n"
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ParseCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def entries(self):
+        return sorted(name for name in os.listdir(self.directory.name) if name.endswith(ParseCache.SUFFIX))
+
+    def test_parse(self):
+        codes = self.cache.parse(self.DOCUMENT)
+        self.assertEqual((0, 1), (self.cache.hits, self.cache.misses))
+        cached = self.cache.parse(self.DOCUMENT)
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+        self.assertEqual([code.title for code in codes], [code.title for code in cached])
+        self.assertEqual([[str(block) for block in code.blocks] for code in codes],
+                         [[str(block) for block in code.blocks] for code in cached])
+        self.assertEqual(1, len(self.entries()))
+
+    def test_parseFile(self):
+        path = os.path.join(self.directory.name, "codes.txt")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(self.DOCUMENT)
+        self.cache.CHUNK = 7  # Hashed over several chunks
+        self.assertEqual(2, len(self.cache.parse_file(path)))
+        self.assertEqual(2, len(self.cache.parse_file(path)))
+        self.assertEqual(1, self.cache.hits)
+        self.cache.parse(self.DOCUMENT)  # Same content, same entry
+        self.assertEqual(2, self.cache.hits)
+
+    def test_evict(self):
+        self.cache.parse(self.DOCUMENT)
+        size = os.path.getsize(os.path.join(self.directory.name, self.entries()[0]))
+        self.cache.max_size = 3 * size
+        oldest = self.entries()[0]
+        time.sleep(0.01)
+        self.cache.parse(self.DOCUMENT + "\n[A]\n")
+        time.sleep(0.01)
+        self.cache.parse(self.DOCUMENT + "\n[B]\n")
+        self.assertEqual(2, len(self.entries()))
+        self.assertNotIn(oldest, self.entries())
+
+    def test_corrupt(self):
+        self.cache.parse(self.DOCUMENT)
+        with open(os.path.join(self.directory.name, self.entries()[0]), 'wb') as file:
+            file.write(b"ARTK")
+        self.assertEqual(2, len(self.cache.parse(self.DOCUMENT)))
+        self.assertEqual((0, 2), (self.cache.hits, self.cache.misses))
+
+    def test_key(self):
+        self.assertNotEqual(ParseCache.key(b"a"), ParseCache.key(b"b"))
+        self.assertEqual(ParseCache.key(b"a"), ParseCache.key(b"a"))
+
+
+if __name__ == '__main__':
+    unittest.main()
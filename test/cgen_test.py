@@ -0,0 +1,68 @@
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from artalk.cgen import CGenerator, generate
+from artalk.generator import Generator
+from artalk.parser import Parser
+
+
+class CGeneratorTest(unittest.TestCase):
+    DOCUMENT = """[Infinite */ Money]
+D3000000 00000010
+51234567 89ABCDEF
+C0000000 00000004
+11234567 000089AB
+D1000000 00000002
+D0000000 00000000
+DD000000 00000041
+E2001000 00000006
+12345678 0000AABB
+D0000000 00000000
+D2000000 00000000
+"""
+
+    def test_code(self):
+        text = generate(Parser().parse(self.DOCUMENT))
+        self.assertIn("/* Infinite * / Money */\nvoid code_0(uint32_t buttons)\n", text)
+        self.assertIn("static const uint8_t patch_0[] = {0x78, 0x56, 0x34, 0x12, 0xBB, 0xAA};\n", text)
+        body = text[text.index("void code_0"):]
+        self.assertIn("""    offset = 0x00000010;
+    if (0x89abcdef == U32(0x01234567 + offset)) {
+        for (uint32_t i2 = 0; i2 < 0x00000004; i2++) {
+            U16(0x01234567 + offset) = 0x89ab;
+            offset += 0x00000002;
+        }
+    }
+    if ((buttons & 0x0041) == 0x0041) {
+        memcpy((void*)(uintptr_t)(0x02001000 + offset), patch_0, 6);
+    }
+    offset = 0; dxdata = 0;
+}
+""", body)
+        self.assertIn("void run_codes(uint32_t buttons)\n{\n    code_0(buttons);\n}\n", text)
+
+    def test_output(self):
+        output = io.StringIO()
+        generator = CGenerator(output, comments=True)
+        generator.program(Parser().parse(self.DOCUMENT), entry="run")
+        self.assertIn("U16(0x01234567 + offset) = 0x89ab; /* 11234567 000089AB */\n", output.getvalue())
+        self.assertIn("void run(uint32_t buttons)", output.getvalue())
+
+    @unittest.skipIf(shutil.which("cc") is None, "No C compiler")
+    def test_compiles(self):
+        codes = [code for code, _ in zip(Generator(3, max_depth=3, patch_sizes=[3, 8]).codes(), range(30))]
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "codes.c")
+            with open(source, 'w') as file:
+                generate(codes, comments=True, output=file)
+            result = subprocess.run(["cc", "-std=c99", "-c", "-o", os.path.join(directory, "codes.o"), source],
+                                    capture_output=True, text=True)
+            self.assertEqual(0, result.returncode, result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -27,6 +27,31 @@ class TestMemoryWrite(unittest.TestCase):
         self.assertEqual("29ABCDEF 00000078", str(block))
 
 
+class TestBlock(unittest.TestCase):
+    def test_slots(self):
+        blocks = [WWrite(1, 2), SGreaterThan(1, 2, 3), LoadOffset(2), SetOffset1(1), Repeat(1), ConditionEnd(),
+                  DxDataWordWrite(2), WaitForButton(1), Memory(1, 2)]
+        for block in blocks:
+            self.assertFalse(hasattr(block, '__dict__'), type(block).__name__)
+
+    def test_words(self):
+        block = SGreaterThan(0xF, 0x20200, 0xAA)
+        self.assertEqual(0x70020200, block._first)
+        self.assertEqual(0x00AA000F, block._second)
+        self.assertEqual("70020200", block.first)
+        self.assertEqual("00AA000F", block.second)
+        self.assertRaises(AttributeError, setattr, block, 'value', 1)
+
+    def test_fromWords(self):
+        block = SGreaterThan.from_words(0x70020200, 0x00AA000F)
+        self.assertEqual(SGreaterThan, type(block))
+        self.assertEqual("70020200 00AA000F", str(block))
+        self.assertEqual(0x20200, block.address)
+        self.assertEqual(0xF, block.value)
+        self.assertEqual(0xAA, block.mask)
+        self.assertEqual(str(SGreaterThan(0xF, 0x20200, 0xAA)), str(block))
+
+
 class TestWWrite(unittest.TestCase):
     FIRST = 0x00020200
     SECOND = 0x0000000F
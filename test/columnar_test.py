@@ -0,0 +1,159 @@
+import os
+import tempfile
+import unittest
+from artalk import binary
+from artalk.memory import MemoryImage
+from artalk.parser import Parser
+from artalk.vm import COMPARISONS
+
+try:
+    import numpy
+    from artalk.columnar import BlockStore, map_dumps
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class BlockStoreTest(unittest.TestCase):
+    DOCUMENT = """
+[Pokémon Generator]
+D3000000 00000000
+01234567 89ABCDEF
+71234567 00FF0001
+DD000000 00000044
+D0000000 00000000
+
+[Patch]
+E0001000 00000008
+01234567 89ABCDEF
+B0001000 00000000
+D2000000 00000000
+"""
+
+    def setUp(self):
+        self.codes = Parser().parse(self.DOCUMENT)
+        self.stores = [BlockStore.from_codes(self.codes), BlockStore.from_binary(binary.dumps(self.codes))]
+
+    def test_columns(self):
+        for store in self.stores:
+            self.assertEqual(8, len(store))
+            self.assertListEqual([0, 0, 0, 0, 0, 1, 1, 1], store.code_id.tolist())
+            self.assertEqual(0x01234567, int(store.addresses()[1]))
+            self.assertEqual(0x0001, int(store.values()[2]))
+            self.assertEqual(0x00FF, int(store.masks()[2]))
+            self.assertEqual(0x89ABCDEF, int(store.values()[1]))
+            self.assertEqual(0, int(store.masks()[1]))
+
+    def test_typeCounts(self):
+        for store in self.stores:
+            self.assertDictEqual({"SetOffset1": 1, "WWrite": 1, "SGreaterThan": 1, "WaitForButton": 1,
+                                  "ConditionEnd": 1, "Patch": 1, "LoadOffset": 1, "Reset": 1}, store.type_counts())
+            self.assertTrue(store.valid().all())
+
+    def test_valid(self):
+        store = BlockStore(numpy.array([0x11234567, 0xD0000000, 0xDD000000, 0xDE000000, 0xC0000001], dtype=numpy.uint32),
+                           numpy.array([0x00010000, 0x00000001, 0x00001000, 0, 0], dtype=numpy.uint32),
+                           numpy.zeros(5, dtype=numpy.uint32), ["Invalid"])
+        self.assertListEqual([False] * 5, store.valid().tolist())
+        self.assertEqual(1, store.type_counts()["Unknown"])
+        self.assertRaises(Exception, store.block, 3)
+        for row in (0, 1, 2, 4):  # Known kinds with an invalid layout
+            self.assertRaisesRegex(Exception, "No matching block pattern", store.block, row)
+
+    def test_materialize(self):
+        for store in self.stores:
+            for index, code in enumerate(self.codes):
+                rebuilt = store.code(index)
+                self.assertEqual(code.title, rebuilt.title)
+                self.assertEqual([(type(block), str(block)) for block in code.blocks],
+                                 [(type(block), str(block)) for block in rebuilt.blocks])
+            self.assertEqual(self.codes[1].blocks[0].bytes, store.block(5).bytes)
+
+    def test_addressHistogram(self):
+        counts, _ = self.stores[0].address_histogram(bins=16)
+        self.assertEqual(8, counts.sum())
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class EvaluateTest(unittest.TestCase):
+    DOCUMENT = """
+[Words]
+30001000 00000010
+40001000 00000010
+50001004 12345678
+60001004 12345678
+
+[Shorts]
+70001008 00FF0012
+80001008 00000012
+9000100A 0000ABCD
+A000100A 000FABC0
+
+[None]
+00001000 00000001
+
+[Outside]
+50000FFE 00000000
+50001FFE 00000000
+"""
+    BASE = 0x1000
+    SIZE = 0x1000
+
+    def setUp(self):
+        self.codes = Parser().parse(self.DOCUMENT)
+        self.store = BlockStore.from_codes(self.codes)
+        random = numpy.random.default_rng(0)
+        self.dumps = random.integers(0, 256, (50, self.SIZE), dtype=numpy.uint8)
+        self.dumps[::2, 4:8] = [0x78, 0x56, 0x34, 0x12]
+        self.dumps[::3, 10:12] = [0xCD, 0xAB]
+
+    def expected(self, dump) -> list:
+        memory = MemoryImage(base=self.BASE, data=bytes(dump))
+        result = []
+        for code in self.codes:
+            for block in code.blocks:
+                if not hasattr(block, 'condition'):
+                    continue
+                if block.address < self.BASE or block.address + 4 > self.BASE + self.SIZE:
+                    result.append(False)
+                elif hasattr(block, 'mask'):
+                    result.append(COMPARISONS[block.condition](block.value, memory.read16(block.address) & ~block.mask))
+                else:
+                    result.append(COMPARISONS[block.condition](block.value, memory.read32(block.address)))
+        return result
+
+    def test_evaluate(self):
+        self.assertEqual(10, len(self.store.conditionals()))
+        matrix = self.store.evaluate(self.dumps, self.BASE, chunk=7)
+        self.assertEqual((50, 10), matrix.shape)
+        for dump, row in zip(self.dumps, matrix):
+            self.assertEqual(self.expected(dump), row.tolist())
+        self.assertTrue(matrix[::2, 2].all())
+        self.assertTrue(matrix[::3, 6].all())
+
+    def test_words(self):
+        words = self.dumps.view(numpy.uint32)
+        self.assertTrue((self.store.evaluate(words, self.BASE) == self.store.evaluate(self.dumps, self.BASE)).all())
+        self.assertRaises(Exception, self.store.evaluate, self.dumps[0], self.BASE)
+
+    def test_activations(self):
+        matrix = self.store.evaluate(self.dumps, self.BASE)
+        activations = self.store.activations(self.dumps, self.BASE)
+        self.assertEqual((50, 4), activations.shape)
+        self.assertEqual(matrix[:, :4].all(axis=1).tolist(), activations[:, 0].tolist())
+        self.assertEqual(matrix[:, 4:8].all(axis=1).tolist(), activations[:, 1].tolist())
+        self.assertTrue(activations[:, 2].all())
+        self.assertFalse(activations[:, 3].any())
+
+    def test_mapDumps(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dumps.bin")
+            self.dumps.tofile(path)
+            dumps = map_dumps(path, self.SIZE)
+            self.assertEqual(self.dumps.shape, dumps.shape)
+            self.assertTrue((self.store.evaluate(dumps, self.BASE) == self.store.evaluate(self.dumps, self.BASE)).all())
+            del dumps
+
+
+if __name__ == '__main__':
+    unittest.main()
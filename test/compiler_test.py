@@ -0,0 +1,97 @@
+import unittest
+
+from artalk.compiler import Compiler, compile_code, run_frames
+from artalk.memory import MemoryImage
+from artalk.parser import Parser
+from artalk.vm import Machine
+
+PROGRAMS = [
+    "D3000000 00000100\n00000010 12345678\n10000020 0000ABCD\n20000030 000000EF\n",
+    "50000100 00000005\n00000200 00000001\nD0000000 00000000\n"
+    "60000100 00000005\n00000204 00000001\nD0000000 00000000\n"
+    "30000100 00000006\n00000208 00000001\nD0000000 00000000\n"
+    "40000100 00000006\n0000020C 00000001\nD0000000 00000000\n",
+    "90000100 00FF1200\n00000200 00000001\nD0000000 00000000\n"
+    "90000100 00001200\n00000204 00000001\nD0000000 00000000\n",
+    "D3000000 00000100\nC0000000 00000004\n20000000 000000AA\nD1000000 00000002\n20000000 000000BB\n",
+    "C0000000 00000003\nC0000000 00000002\n20000300 00000001\nD1000000 00000001\nD1000000 00000010\n",
+    "C0000000 00000000\n00000200 00000001\nD1000000 00000004\n00000204 00000001\n",
+    "C0000000 00000002\n00000200 00000001\nD2000000 00000000\nC0000000 00000000\n00000204 00000001\n",
+    "B0000104 00000000\n00000010 00000001\n",
+    "D6000000 00000100\nD4000000 00000001\nD3000000 00000200\nD9000000 00000000\n"
+    "DA000000 00000000\nDB000000 00000000\nDC000000 00000010\nD5000000 00000007\nD9000000 00000000\n",
+    "DD000000 00000041\n00000100 00000001\nD0000000 00000000\n",
+    "E0000100 00000006\n12345678 0000AABB\nD3000000 00000100\nF0000200 00000006\n",
+    "D3000000 00000100\n50000000 00000001\nD2000000 00000000\n00000010 00000001\n",
+    "D3000000 00000100\n50000000 00000000\nDC000000 00000004\nD0000000 00000000\n00000010 00000001\n",
+    "50000018 00000001\nC0000000 00000000\n",
+]
+
+
+class CompilerTest(unittest.TestCase):
+    @staticmethod
+    def parse(text: str):
+        return Parser().parse("[Test]\n" + text)[0]
+
+    @staticmethod
+    def memory() -> MemoryImage:
+        memory = MemoryImage(0x1000)
+        memory.write32(0x100, 5)
+        memory.write16(0x100, 0x12FF)
+        memory.write32(0x104, 0x400)
+        return memory
+
+    def test_matchesMachine(self):
+        for text in PROGRAMS:
+            for buttons in (0, 0x41):
+                with self.subTest(text=text, buttons=buttons):
+                    code = self.parse(text)
+                    expected = self.memory()
+                    machine = Machine(expected, buttons)
+                    machine.run(code)
+                    actual = self.memory()
+                    registers = compile_code(code)(actual, buttons)
+                    self.assertEqual(expected.data, actual.data)
+                    self.assertEqual((machine.offset, machine.dxdata), registers)
+
+    def test_foldsConstants(self):
+        source = Compiler().source(self.parse("D3000000 00000100\n00000010 12345678\n"
+                                              "50000020 00000005\n00000030 00000001\nD0000000 00000000\n"))
+        self.assertIn("write32(0x110, 0x12345678)", source)
+        self.assertIn("if 0x5 == read32(0x120):", source)
+        self.assertIn("write32(0x130, 0x1)", source)
+
+    def test_offsetUnknownInLoop(self):
+        source = Compiler().source(self.parse("C0000000 00000004\n20000000 000000AA\nD1000000 00000002\n"
+                                              "20000010 000000BB\n"))
+        self.assertIn("for _ in range(4):", source)
+        self.assertIn("write8((0x0 + offset) & 0xFFFFFFFF, 0xaa)", source)
+        self.assertIn("write8((0x10 + offset) & 0xFFFFFFFF, 0xbb)", source)
+
+    def test_cached(self):
+        code = self.parse("00000100 00000001\n")
+        function = code.compile()
+        self.assertIs(function, code.compile())
+        code.add_block("00000104", "00000002")
+        self.assertIsNot(function, code.compile())
+        memory = self.memory()
+        code.compile()(memory)
+        self.assertEqual(2, memory.read32(0x104))
+
+    def test_emptyBody(self):
+        source = Compiler().source(self.parse("50000018 00000001\nC0000000 00000000\n"))
+        self.assertIn("if 0x1 == read32(0x18):\n        pass\n", source)
+
+    def test_unbalanced(self):
+        self.assertRaises(Exception, compile_code, self.parse("D0000000 00000000\n"))
+
+    def test_runFrames(self):
+        code = self.parse("DD000000 00000001\nD5000000 00000000\nD8000000 00000200\nD4000000 00000001\n"
+                          "D3000000 00000200\nDB000000 00000000\nD0000000 00000000\n")
+        memory = MemoryImage(0x1000)
+        run_frames([code], memory, 10, lambda frame: frame % 2)
+        self.assertEqual(5, memory.read8(0x200))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from artalk.flow import build, Node, ConditionNode, LoopNode, ButtonNode
+from artalk.generator import Generator
+from artalk.parser import Parser
+
+
+class FlowTest(unittest.TestCase):
+    DOCUMENT = """[Nested]
+D3000000 00000010
+51234567 00000001
+C0000000 00000004
+DD000000 00000001
+01234567 89ABCDEF
+D0000000 00000000
+D1000000 00000004
+D0000000 00000000
+21234567 00000089
+"""
+
+    def test_build(self):
+        code = Parser().parse(self.DOCUMENT)[0]
+        root = code.flow()
+        self.assertEqual(3, root.depth())
+        self.assertEqual(3, len(root.children))
+        condition = root.children[1]
+        self.assertEqual(ConditionNode, type(condition))
+        self.assertEqual((1, 7), (condition.index, condition.end_index))
+        loop = condition.children[0]
+        self.assertEqual(LoopNode, type(loop))
+        self.assertEqual(ButtonNode, type(loop.children[0]))
+        self.assertEqual(["condition", "loop", "button"], [node.KIND for node in root.nodes()])
+        self.assertEqual(code.blocks, list(root.walk()))
+
+    def test_reset(self):
+        code = Parser().parse("[A]\n51234567 00000001\nC0000000 00000004\nD2000000 00000000\n01234567 89ABCDEF\n")[0]
+        root = code.flow()
+        self.assertEqual(3, len(root.children))
+        self.assertIsNone(root.children[0].end)
+        self.assertEqual(code.blocks, list(root.walk()))
+
+    def test_openAtEnd(self):
+        code = Parser().parse("[A]\n51234567 00000001\n01234567 89ABCDEF\n")[0]
+        self.assertIsNone(code.flow().children[0].end)
+
+    def test_unbalanced(self):
+        with self.assertRaisesRegex(Exception, "Line 3: ConditionEnd without an open block"):
+            Parser().parse("[A]\n01234567 89ABCDEF\nD0000000 00000000\n")[0].flow()
+        with self.assertRaisesRegex(Exception, "Line 5: RepetitionEnd can't close the condition opened at line 4"):
+            Parser().parse("[A]\nC0000000 00000004\n\n51234567 00000001\nD1000000 00000000\n")[0].flow()
+        with self.assertRaisesRegex(Exception, "Block 1: RepetitionEnd without an open block"):
+            build(Parser().parse("[A]\nD1000000 00000000\n")[0].blocks)
+
+    def test_cached(self):
+        code = Parser().parse(self.DOCUMENT)[0]
+        root = code.flow()
+        self.assertIs(root, code.flow())
+        code.blocks.pop()
+        changed = code.flow()
+        self.assertIsNot(root, changed)
+        self.assertEqual(2, len(changed.children))
+
+    def test_generated(self):
+        generator = Generator(9, max_depth=4)
+        for code, _ in zip(generator.codes(), range(200)):
+            root = code.flow()
+            self.assertEqual(code.blocks, list(root.walk()))
+            self.assertLessEqual(root.depth(), 4)
+            self.assertIsInstance(root, Node)
+
+
+if __name__ == '__main__':
+    unittest.main()
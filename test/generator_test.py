@@ -0,0 +1,65 @@
+import io
+import unittest
+
+from artalk.codeblocks import Patch, Repeat, RepetitionEnd, ConditionEnd, Reset, Conditional32bitCodes, \
+    Conditional16bitCodes, WaitForButton
+from artalk.generator import Generator
+from artalk.parser import Parser
+
+
+class GeneratorTest(unittest.TestCase):
+    def test_deterministic(self):
+        self.assertEqual(Generator(7).document(300), Generator(7).document(300))
+        self.assertNotEqual(Generator(7).document(300), Generator(8).document(300))
+
+    def test_parses(self):
+        generator = Generator(3, patch_sizes=[6, 12, 40])
+        document = generator.document(2000)
+        self.assertGreaterEqual(len(document.splitlines()), 2000)
+        codes = Parser().parse(document)
+        expected = [code for code, _ in zip(Generator(3, patch_sizes=[6, 12, 40]).codes(), codes)]
+        self.assertEqual([code.title for code in expected], [code.title for code in codes])
+        self.assertEqual([[str(block) for block in code.blocks] for code in expected],
+                         [[str(block) for block in code.blocks] for code in codes])
+        patches = [block for code in codes for block in code.blocks if type(block) == Patch]
+        self.assertGreater(len(patches), 0)
+        self.assertTrue(all(len(block.bytes) == block.value for block in patches))
+
+    def test_nesting(self):
+        opening = (Conditional32bitCodes, Conditional16bitCodes, WaitForButton, Repeat)
+        closing = (ConditionEnd, RepetitionEnd)
+        for max_depth in (0, 1, 3):
+            generator = Generator(1, distribution={"conditional": 1, "loop": 1, "write": 1}, max_depth=max_depth)
+            for code, _ in zip(generator.codes(), range(50)):
+                depth = 0
+                deepest = 0
+                for block in code.blocks:
+                    if isinstance(block, opening):
+                        depth += 1
+                        deepest = max(deepest, depth)
+                    elif isinstance(block, closing):
+                        depth -= 1
+                self.assertEqual(0, depth)
+                self.assertLessEqual(deepest, max_depth)
+                self.assertEqual(Reset, type(code.blocks[-1]))
+
+    def test_distribution(self):
+        generator = Generator(5, distribution={"patch": 1}, patch_sizes=[8])
+        code = next(generator.codes())
+        self.assertTrue(all(type(block) in (Patch, Reset) for block in code.blocks))
+        self.assertRaises(Exception, Generator, distribution={"jump": 1})
+
+    def test_write(self):
+        file = io.StringIO()
+        size = Generator(2).write(file, size=4096)
+        self.assertEqual(size, len(file.getvalue()))
+        self.assertGreaterEqual(size, 4096)
+        self.assertLess(size, 4096 + 2048)
+        self.assertEqual(file.getvalue(), Generator(2).document(len(file.getvalue().splitlines()))[:size])
+        file = io.StringIO()
+        Generator(2).write(file, lines=100)
+        self.assertGreaterEqual(len(file.getvalue().splitlines()), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from artalk.incremental import IncrementalParser
+
+
+class IncrementalParserTest(unittest.TestCase):
+    DOCUMENT = """Notes
+[Pokémon Generator]
+D3000000 00000000
+01234567 89ABCDEF
+
+[Infinite Money]
+21234567 00000089
+
+[Max Items]
+11234567 00000063
+"""
+
+    def setUp(self):
+        self.parser = IncrementalParser()
+        self.previous = self.parser.parse(self.DOCUMENT)
+
+    def test_parse(self):
+        self.assertEqual(["Pokémon Generator", "Infinite Money", "Max Items"],
+                         [code.title for code in self.previous.codes])
+        self.assertEqual(self.previous.codes, self.previous.added)
+        self.assertListEqual([], self.previous.removed)
+
+    def test_unchanged(self):
+        result = self.parser.reparse(self.previous, self.DOCUMENT)
+        self.assertEqual(len(self.previous.codes), len(result.codes))
+        for old, new in zip(self.previous.codes, result.codes):
+            self.assertIs(old, new)
+        self.assertEqual(([], [], []), (result.added, result.removed, result.modified))
+
+    def test_modified(self):
+        result = self.parser.reparse(self.previous, self.DOCUMENT.replace("00000089", "000000FF"))
+        self.assertIs(self.previous.codes[0], result.codes[0])
+        self.assertIs(self.previous.codes[2], result.codes[2])
+        self.assertEqual([(self.previous.codes[1], result.codes[1])], result.modified)
+        self.assertEqual(0xFF, result.codes[1].blocks[0].value)
+        self.assertEqual(([], []), (result.added, result.removed))
+
+    def test_addedRemoved(self):
+        document = self.DOCUMENT.replace("[Max Items]", "[Max Money]") + "[Walk Through Walls]\nD3000000 00000000\n"
+        result = self.parser.reparse(self.previous, document)
+        self.assertEqual(["Max Money", "Walk Through Walls"], [code.title for code in result.added])
+        self.assertEqual([self.previous.codes[2]], result.removed)
+        self.assertListEqual([], result.modified)
+
+    def test_moved(self):
+        sections = [section for section, _ in self.parser.sections(self.DOCUMENT)]
+        result = self.parser.reparse(self.previous, sections[2] + sections[0] + sections[1])
+        self.assertIs(self.previous.codes[2].blocks[0], result.codes[0].blocks[0])
+        self.assertEqual(([], [], []), (result.added, result.removed, result.modified))
+
+    def test_moved_lineNumbers(self):
+        self.assertEqual([3, 4], self.previous.codes[0].line_numbers)
+        sections = [section for section, _ in self.parser.sections(self.DOCUMENT)]
+        result = self.parser.reparse(self.previous, sections[2] + sections[0] + sections[1])
+        self.assertEqual([2], result.codes[0].line_numbers)
+        self.assertEqual([4, 5], result.codes[1].line_numbers)
+        self.assertEqual([8], result.codes[2].line_numbers)
+
+    def test_moved_keepsPrevious(self):
+        sections = [section for section, _ in self.parser.sections(self.DOCUMENT)]
+        moved = sections[2] + sections[0] + sections[1]
+        self.parser.reparse(self.previous, moved)
+        self.assertEqual([[3, 4], [7], [10]], [code.line_numbers for code in self.previous.codes])
+        result = self.parser.reparse(self.previous, moved)
+        self.assertEqual([[2], [4, 5], [8]], [code.line_numbers for code in result.codes])
+
+    def test_lineNumbers(self):
+        with self.assertRaisesRegex(Exception, "Line 7"):
+            self.parser.reparse(self.previous, self.DOCUMENT.replace("21234567 00000089", "21234567 0000008"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import main
+from artalk.codeblocks import OutOfRangeError
+
+
+class MainTest(unittest.TestCase):
+    DOCUMENT = "[Pokémon Generator]\nD3000000 00000000\n01234567 89ABCDEF\n\n[Infinite Money]\n21234567 00000089\n"
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        for name in ("a.txt", "b.txt", os.path.join("sub", "c.txt")):
+            path = os.path.join(self.directory.name, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(self.DOCUMENT)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_main(self, *args: str):
+        errors = io.StringIO()
+        with contextlib.redirect_stderr(errors):
+            status = main.main(list(args))
+        return status, errors.getvalue()
+
+    def test_human(self):
+        output = os.path.join(self.directory.name, "out")
+        status, errors = self.run_main(os.path.join(self.directory.name, "**", "*.txt"), "-o", output, "-j", "2")
+        self.assertEqual(0, status)
+        self.assertIn("Translated 3 of 3 files.", errors)
+        self.assertEqual(["a.readable.txt", "b.readable.txt", "c.readable.txt"], sorted(os.listdir(output)))
+        with open(os.path.join(output, "a.readable.txt"), encoding='utf-8') as file:
+            lines = file.read().splitlines()
+        self.assertEqual(["", "[Pokémon Generator]", "D3000000 00000000: Set offset to 0x00000000",
+                          "01234567 89ABCDEF: Write word 0x89ABCDEF to [0x01234567 + offset]"], lines[:4])
+
+    def test_c(self):
+        path = os.path.join(self.directory.name, "a.txt")
+        status, _ = self.run_main(path, "-f", "c", "-j", "1")
+        self.assertEqual(0, status)
+        with open(os.path.join(self.directory.name, "a.c"), encoding='utf-8') as file:
+            text = file.read()
+        self.assertIn("// Infinite Money\n*((int*)0x01234567 + offset) = 0x89;\n", text)
+
+    def test_errors(self):
+        broken = os.path.join(self.directory.name, "broken.txt")
+        with open(broken, 'w') as file:
+            file.write("[A]\nnot a block\n")
+        missing = os.path.join(self.directory.name, "missing*.txt")
+        status, errors = self.run_main(os.path.join(self.directory.name, "*.txt"), missing, "-j", "2")
+        self.assertEqual(1, status)
+        self.assertIn("Translated 2 of 3 files.", errors)
+        self.assertIn(f"{broken}: Line 2", errors)
+        self.assertIn(f"{missing}: No such file", errors)
+        self.assertFalse(os.path.exists(os.path.join(self.directory.name, "broken.readable.txt")))
+        self.assertEqual([], [name for name in os.listdir(self.directory.name) if name.endswith(".tmp")])
+
+    def test_collisions(self):
+        os.makedirs(os.path.join(self.directory.name, "other"))
+        duplicate = os.path.join(self.directory.name, "other", "a.txt")
+        with open(duplicate, 'w', encoding='utf-8') as file:
+            file.write(self.DOCUMENT)
+        output = os.path.join(self.directory.name, "out")
+        status, errors = self.run_main(os.path.join(self.directory.name, "*.txt"),
+                                       os.path.join(self.directory.name, "other", "*.txt"), "-o", output, "-j", "2")
+        self.assertEqual(1, status)
+        self.assertIn("Translated 1 of 3 files.", errors)
+        self.assertIn(f"{duplicate}: Output", errors)
+        self.assertIn(f"would also be written by {os.path.join(self.directory.name, 'a.txt')}", errors)
+        self.assertEqual(["b.readable.txt"], os.listdir(output))
+
+    def test_ownOutputs(self):
+        pattern = os.path.join(self.directory.name, "*")
+        self.assertEqual(0, self.run_main(pattern, "-f", "c", "-j", "1")[0])
+        status, errors = self.run_main(pattern, "-f", "c", "-j", "1")
+        self.assertEqual(0, status)
+        self.assertIn("Translated 2 of 2 files.", errors)
+        self.assertEqual(["a.c", "a.txt", "b.c", "b.txt", "sub"], sorted(os.listdir(self.directory.name)))
+        status, errors = self.run_main(os.path.join(self.directory.name, "a.c"))
+        self.assertEqual(1, status)
+        self.assertIn("Only matches translated outputs", errors)
+
+    def test_overwriteInput(self):
+        path = os.path.join(self.directory.name, "a.c")
+        errors = main.collisions([(path, path, "c", False)])
+        self.assertEqual(1, len(errors))
+        self.assertIn("would overwrite an input", errors[0][1])
+
+    def test_outOfRange(self):
+        path = os.path.join(self.directory.name, "a.txt")
+        output = main.output_path(path, None, "human")
+        with mock.patch.object(main.Parser, "parse_file", side_effect=OutOfRangeError("Value", 0, 0xFF, 0x100)):
+            self.assertIn("Value should be between", main.translate((path, output, "human", False)))
+        self.assertFalse(os.path.exists(output))
+
+
+if __name__ == '__main__':
+    unittest.main()
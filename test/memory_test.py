@@ -0,0 +1,168 @@
+import os
+import tempfile
+import unittest
+
+from artalk.memory import MemoryImage, PagedMemory, PAGE_SIZE, Snapshot
+from artalk.parser import Parser
+from artalk.vm import Machine
+
+
+class MemoryImageTest(unittest.TestCase):
+    def test_access(self):
+        memory = MemoryImage(0x100, base=0x1000)
+        memory.write32(0x1000, 0x12345678)
+        self.assertEqual(b"\x78\x56\x34\x12", memory.read(0x1000, 4))
+        self.assertEqual(0x5678, memory.read16(0x1000))
+        self.assertEqual(0x34, memory.read8(0x1002))
+        memory.write16(0x1010, 0x1ABCD)
+        self.assertEqual(0xABCD, memory.read16(0x1010))
+        memory.write8(0x10FF, 0x1FF)
+        self.assertEqual(0xFF, memory.read8(0x10FF))
+
+    def test_copy(self):
+        memory = MemoryImage(data=b"abcdefgh")
+        memory.copy(2, 0, 4)
+        self.assertEqual(b"ababcdgh", memory.read(0, 8))
+        memory.write(6, b"XY")
+        self.assertEqual(b"XY", memory.read(6, 2))
+
+    def test_outOfRange(self):
+        memory = MemoryImage(0x10, base=0x1000)
+        self.assertRaises(Exception, memory.read32, 0x0FFF)
+        self.assertRaises(Exception, memory.read32, 0x100D)
+        self.assertRaises(Exception, memory.write, 0x100F, b"ab")
+        memory.read32(0x100C)
+
+
+class PagedMemoryTest(unittest.TestCase):
+    def test_access(self):
+        memory = PagedMemory()
+        self.assertEqual(0, memory.read32(0x0FFFFFF0))
+        self.assertEqual(0, len(memory))
+        memory.write32(0xFFFFFFFC, 0x12345678)
+        self.assertEqual(b"\x78\x56\x34\x12", memory.read(0xFFFFFFFC, 4))
+        self.assertEqual(0x5678, memory.read16(0xFFFFFFFC))
+        self.assertEqual(0x34, memory.read8(0xFFFFFFFE))
+        memory.write16(0x1010, 0x1ABCD)
+        self.assertEqual(0xABCD, memory.read16(0x1010))
+        memory.write8(0x10FF, 0x1FF)
+        self.assertEqual(0xFF, memory.read8(0x10FF))
+        self.assertEqual(2, len(memory))
+        self.assertEqual(2 * PAGE_SIZE, memory.allocated)
+
+    def test_pageCrossing(self):
+        memory = PagedMemory()
+        memory.write32(PAGE_SIZE - 2, 0xAABBCCDD)
+        self.assertEqual(0xAABBCCDD, memory.read32(PAGE_SIZE - 2))
+        self.assertEqual(0xBBCC, memory.read16(PAGE_SIZE - 1))
+        memory.write16(2 * PAGE_SIZE - 1, 0x1122)
+        self.assertEqual(0x1122, memory.read16(2 * PAGE_SIZE - 1))
+        data = bytes(range(256)) * 40
+        memory.write(0x10000 - 5, data)
+        self.assertEqual(data, memory.read(0x10000 - 5, len(data)))
+
+    def test_copy(self):
+        memory = PagedMemory()
+        memory.write(PAGE_SIZE - 4, b"abcdefgh")
+        memory.copy(PAGE_SIZE - 2, PAGE_SIZE - 4, 4)
+        self.assertEqual(b"ababcdgh", memory.read(PAGE_SIZE - 4, 8))
+        memory.copy(0x80000000, 0x40000000, 16)
+        self.assertEqual(bytes(16), memory.read(0x80000000, 16))
+
+    def test_outOfRange(self):
+        memory = PagedMemory()
+        self.assertRaises(Exception, memory.read32, 0xFFFFFFFE)
+        self.assertRaises(Exception, memory.write, 0xFFFFFFFF, b"ab")
+        self.assertRaises(Exception, memory.read8, -1)
+        memory.read32(0xFFFFFFFC)
+
+    def test_dumps(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ram.bin")
+            data = bytearray(3 * PAGE_SIZE)
+            data[10:14] = b"\x01\x02\x03\x04"
+            data[-1] = 0xFF
+            with open(path, 'wb') as file:
+                file.write(data)
+            memory = PagedMemory()
+            memory.load(path, 0x02000000 + 8)
+            self.assertEqual(2, len(memory))
+            self.assertEqual(0x04030201, memory.read32(0x02000000 + 18))
+            self.assertEqual(0xFF, memory.read8(0x02000000 + 8 + len(data) - 1))
+
+            memory.save(path, 0x02000000 + 8, len(data))
+            with open(path, 'rb') as file:
+                self.assertEqual(data, file.read())
+            memory.save(path)
+            with open(path, 'rb') as file:
+                self.assertEqual(4 * PAGE_SIZE, len(file.read()))
+
+    def test_machine(self):
+        code = Parser().parse("[Test]\nD3000000 F0000000\n0FFFFFFC 12345678\nE0001000 00000008\n"
+                              "11223344 55667788\nF0100000 00000008\n")[0]
+        memory = PagedMemory()
+        Machine(memory).run(code)
+        self.assertEqual(0x12345678, memory.read32(0xFFFFFFFC))
+        self.assertEqual(bytes.fromhex("4433221188776655"), memory.read(0xF0001000, 8))
+        self.assertEqual(3, len(memory))
+        compiled = PagedMemory()
+        code.compile()(compiled)
+        self.assertEqual(memory.pages, compiled.pages)
+
+
+class SnapshotTest(unittest.TestCase):
+    def test_restore(self):
+        memory = PagedMemory()
+        memory.write32(0x1000, 1)
+        snapshot = memory.snapshot()
+        memory.write32(0x1000, 2)
+        memory.write32(0x5000, 3)
+        self.assertEqual(2, memory.read32(0x1000))
+        self.assertEqual(1, snapshot.pages[1][0])
+        memory.restore(snapshot)
+        self.assertEqual(1, memory.read32(0x1000))
+        self.assertEqual(0, memory.read32(0x5000))
+
+    def test_fork(self):
+        memory = PagedMemory()
+        memory.write(0x1000, bytes(range(16)))
+        memory.write32(0x8000, 7)
+        fork = memory.fork()
+        self.assertEqual(0, fork.allocated)
+        fork.write8(0x1000, 0xFF)
+        self.assertEqual(PAGE_SIZE, fork.allocated)
+        self.assertEqual(0, memory.read8(0x1000))
+        self.assertEqual(0xFF, fork.read8(0x1000))
+        self.assertEqual(7, fork.read32(0x8000))
+        self.assertIs(memory._find(8), fork._find(8))
+        memory.write32(0x8000, 8)
+        self.assertEqual(7, fork.read32(0x8000))
+
+    def test_diff(self):
+        memory = PagedMemory()
+        memory.write32(0x1000, 0x11111111)
+        before = memory.snapshot()
+        memory.write8(0x1001, 0x22)
+        memory.write32(PAGE_SIZE * 2 - 2, 0x33333333)
+        memory.write(0x7FFF0000, b"\x00\x00\x01")
+        self.assertEqual([(0x1001, 0x1002), (PAGE_SIZE * 2 - 2, PAGE_SIZE * 2 + 2), (0x7FFF0002, 0x7FFF0003)],
+                         memory.diff(before))
+        self.assertEqual(memory.diff(before), before.diff(memory.snapshot()))
+        self.assertEqual([], memory.diff(memory.fork()))
+
+    def test_deepChains(self):
+        memory = PagedMemory()
+        snapshots = []
+        for value in range(3 * Snapshot.MAX_DEPTH):
+            memory.write32(value * PAGE_SIZE, value + 1)
+            snapshots.append(memory.snapshot())
+        self.assertLess(memory.parent.depth, Snapshot.MAX_DEPTH)
+        self.assertEqual(3 * Snapshot.MAX_DEPTH, len(memory))
+        memory.restore(snapshots[4])
+        self.assertEqual(5, len(memory))
+        self.assertEqual(5, memory.read32(4 * PAGE_SIZE))
+        self.assertEqual(0, memory.read32(5 * PAGE_SIZE))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from artalk.parser import Parser, Code, BlockFactory
+from artalk.parser import Parser, Code, BlockFactory, Tokenizer, BlockCache, Patch
 
 
 class ParserTest(unittest.TestCase):
@@ -73,6 +73,165 @@ A1234567 89ABCDEF
         self.assertEqual(WNotEqualTo, type(block3))
         self.assertEqual("0x89ABCDEF", block2.hex_value())
 
+    def test_parse_invalidLine(self):
+        document = "[Pokémon Generator]\nD3000000 00000000\n\nnot a block\n"
+        with self.assertRaisesRegex(Exception, "Line 4"):
+            Parser().parse(document)
+
+    def test_parse_ignoresPreamble(self):
+        codes = Parser().parse("Some notes\nD3000000 00000000\n[Pokémon Generator]\nD3000000 00000000\n")
+        self.assertEqual(1, len(codes))
+        self.assertEqual(1, len(codes[0].blocks))
+
+    def test_iterParse(self):
+        import io
+        document = "[Pokémon Generator]\nD3000000 00000000\n[Infinite Money]\n01234567 89ABCDEF\n"
+        for file in (io.StringIO(document), io.BytesIO(document.encode('utf-8'))):
+            codes = list(Parser().iter_parse(file))
+            self.assertEqual(["Pokémon Generator", "Infinite Money"], [code.title for code in codes])
+            self.assertEqual(1, len(codes[1].blocks))
+
+    def test_iterParse_lazy(self):
+        consumed = []
+
+        def lines():
+            for line in ["[Pokémon Generator]", "D3000000 00000000", "[Infinite Money]", "01234567 89ABCDEF"]:
+                consumed.append(line)
+                yield line
+
+        codes = Parser().iter_parse(lines())
+        self.assertEqual("Pokémon Generator", next(codes).title)
+        self.assertEqual(3, len(consumed))
+        self.assertEqual("Infinite Money", next(codes).title)
+        self.assertRaises(StopIteration, next, codes)
+
+    def test_parseFile(self):
+        import os
+        import tempfile
+        document = "[Pokémon Generator]\nD3000000 00000000\n\n[Infinite Money]\n01234567 89abcdef\n"
+        for newline in ("\n", "\r\n"):
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "codes.txt")
+                with open(path, 'wb') as file:
+                    file.write(document.replace("\n", newline).encode('utf-8'))
+                codes = Parser().parse_file(path)
+                expected = Parser().parse(document)
+                self.assertEqual([code.title for code in expected], [code.title for code in codes])
+                self.assertEqual([str(block) for code in expected for block in code.blocks],
+                                 [str(block) for code in codes for block in code.blocks])
+                self.assertEqual([type(block) for code in expected for block in code.blocks],
+                                 [type(block) for code in codes for block in code.blocks])
+                open(path, 'wb').close()
+                self.assertListEqual([], Parser().parse_file(path))
+
+    def test_parseFile_invalidLine(self):
+        import os
+        import tempfile
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "codes.txt")
+            with open(path, 'w') as file:
+                file.write("[A]\nD3000000 00000000\nnot a block\n")
+            with self.assertRaisesRegex(Exception, "Line 3"):
+                Parser().parse_file(path)
+
+    def test_parseParallel(self):
+        document = "Notes\n" + "".join(
+            f"[Code {i}]\nD3000000 {i:08X}\nE0000000 00000010\n01234567 89ABCDEF\n01234567 89ABCDEF\n"
+            f"0{i:07X} 89ABCDEF\n\n"
+            for i in range(200)
+        )
+        expected = Parser().parse(document)
+        codes = Parser().parse_parallel(document, workers=2, chunks=7)
+        self.assertEqual([code.title for code in expected], [code.title for code in codes])
+        self.assertEqual([[str(block) for block in code.blocks] for code in expected],
+                         [[str(block) for block in code.blocks] for code in codes])
+        self.assertEqual([[block.bytes for block in code.blocks[1:2]] for code in expected],
+                         [[block.bytes for block in code.blocks[1:2]] for code in codes])
+
+    def test_split(self):
+        document = "Notes\n[A]\nD3000000 00000000\n[B]\nD3000000 00000000\n[C]\nD3000000 00000000\n"
+        parts = Parser.split(document, 3)
+        self.assertEqual(document, "".join(part for part, _ in parts))
+        self.assertTrue(all(part.startswith("[") for part, _ in parts[1:]))
+        for part, line in parts[1:]:
+            self.assertEqual(part.splitlines()[0], document.splitlines()[line - 1])
+        self.assertEqual(1, len(Parser.split(document, 1)))
+
+    def test_parseParallel_lineNumbers(self):
+        document = "[A]\nD3000000 00000000\n[B]\nD3000000 00000000\n[C]\nnot a block\n"
+        with self.assertRaisesRegex(Exception, "Line 6"):
+            Parser().parse_parallel(document, workers=2, chunks=3)
+
+    def test_parse_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+        documents = ["".join(
+            f"[Code {i}-{j}]\n5{j:07X} {i:08X}\nD3000000 {i:08X}\nC0000000 {j:08X}\nD4000000 00000001\n"
+            f"D9000000 {j:08X}\nD1000000 00000000\nDD000000 {1 << j % 12:08X}\nE{i:07X} 00000008\n"
+            f"{i:08X} {j:08X}\nF{j:07X} {i:08X}\nD2000000 00000000\n"
+            for j in range(50)
+        ) for i in range(16)]
+        serial = [[[(type(block), str(block)) for block in code.blocks] for code in Parser().parse(document)]
+                  for document in documents]
+        for parser in (Parser(), Parser(BlockCache(size=64))):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(parser.parse, documents * 8))
+            for index, codes in enumerate(results):
+                self.assertEqual(serial[index % len(documents)],
+                                 [[(type(block), str(block)) for block in code.blocks] for code in codes])
+
+
+class TokenizerTest(unittest.TestCase):
+    def test_tokenize(self):
+        tokens = list(Tokenizer().tokenize("notes\r\n[Pokémon Generator]\r\n  d3000000  0000000a  \r\n\r\n[x]\n"))
+        self.assertEqual(4, len(tokens))
+        self.assertEqual((1, "notes"), (tokens[0].line, tokens[0].text))
+        self.assertEqual((2, "Pokémon Generator"), (tokens[1].line, tokens[1].title))
+        self.assertEqual((3, 0xD3000000, 0x0000000A), (tokens[2].line, tokens[2].first, tokens[2].second))
+        self.assertEqual((5, "x"), (tokens[3].line, tokens[3].title))
+
+    def test_tokenize_bytes(self):
+        text = "notes\r\n[Pokémon Generator]\r\n  d3000000  0000000a  \r\n\r\n[x]\n"
+        tokens = list(Tokenizer().tokenize(text))
+        self.assertListEqual(tokens, list(Tokenizer().tokenize_bytes(text.encode('utf-8'))))
+        self.assertEqual(int, type(tokens[2].first))
+
+    def test_tokenize_blank(self):
+        self.assertListEqual([], list(Tokenizer().tokenize("")))
+        self.assertListEqual([], list(Tokenizer().tokenize(" \n\t\r\n")))
+
+
+class BlockCacheTest(unittest.TestCase):
+    def test_shared(self):
+        cache = BlockCache()
+        document = "[A]\nD0000000 00000000\n01234567 89ABCDEF\n[B]\nd0000000 00000000\n01234567 89ABCDEF\n"
+        codes = Parser(cache).parse(document)
+        self.assertIs(codes[0].blocks[0], codes[1].blocks[0])
+        self.assertIs(codes[0].blocks[1], codes[1].blocks[1])
+        self.assertEqual(2, cache.hits)
+        self.assertEqual(2, cache.misses)
+        self.assertEqual(2, len(cache))
+        Parser(cache).parse(document)
+        self.assertEqual(6, cache.hits)
+
+    def test_lru(self):
+        cache = BlockCache(2)
+        factory = BlockFactory(cache)
+        first = factory.create("D3000000", "00000001")
+        factory.create("D3000000", "00000002")
+        self.assertIs(first, factory.create("D3000000", "00000001"))
+        factory.create("D3000000", "00000003")
+        self.assertEqual(2, len(cache))
+        self.assertIsNot(first, factory.create("D3000000", "00000002"))
+        self.assertEqual(1, cache.hits)
+        cache.clear()
+        self.assertEqual((0, 0, 0), (len(cache), cache.hits, cache.misses))
+
+    def test_patchNotShared(self):
+        cache = BlockCache()
+        factory = BlockFactory(cache)
+        self.assertIsNot(factory.create("E0000000", "00000008"), factory.create("E0000000", "00000008"))
+        self.assertEqual(0, len(cache))
+
 
 class CodeTest(unittest.TestCase):
     def test_isTitle(self):
@@ -109,6 +268,18 @@ class BlockFactoryTest(unittest.TestCase):
         self.assertTrue(self.factory.can_create_block_from("D300000000000000"))
         self.assertFalse(self.factory.can_create_block_from("G3000000 00000000"))
 
+    def test_opcodeRegistry(self):
+        from artalk.parser import Block, WWrite, SNotEqualTo, Repeat, ConditionEnd, AddToOffset, Patch, Memory
+        self.assertEqual(WWrite, Block.OPCODES["0"])
+        self.assertEqual(SNotEqualTo, Block.OPCODES["A"])
+        self.assertEqual(Repeat, Block.OPCODES["C"])
+        self.assertEqual(ConditionEnd, Block.OPCODES["D0000000"])
+        self.assertEqual(AddToOffset, Block.OPCODES["DC000000"])
+        self.assertEqual(Patch, Block.OPCODES["E"])
+        self.assertEqual(Memory, Block.OPCODES["F"])
+        self.assertNotIn("D", Block.OPCODES)
+        self.assertRaises(Exception, self.factory.create_block, "DE000000 00000000")
+
     def test_WordWriter(self):
         block = self.factory.create_block("01234567 890ABCDE")
         self.assertIsNotNone(block)
@@ -483,6 +654,25 @@ class BlockFactoryTest(unittest.TestCase):
         self.assertIsNone(tempBlock)
         self.assertEqual(8, len(block.bytes))
 
+    def test_Patch_payload(self):
+        block = self.factory.create_block("E2001000 0000000A")
+        self.assertIsNone(self.factory.create_block("12345678 9ABCDEF0", block))
+        self.assertEqual(bytearray.fromhex("78563412 F0DEBC9A"), block.bytes)
+        self.assertIsNone(self.factory.create_block("0000AABB 00000000", block))
+        self.assertEqual(10, len(block.bytes))
+        self.assertEqual(["12345678", "9ABCDEF0", "AABB"], list(block.words()))
+        self.assertEqual(f"Copy 0x12345678 9ABCDEF0 AABB(10 bytes) to {block.hex_address(True)}", str(block))
+
+    def test_Patch_preview(self):
+        block = self.factory.create_block("E2001000 00000100")
+        for _ in range(0x100 // 8):
+            self.factory.create_block("01234567 89ABCDEF", block)
+        self.assertEqual(0x100, len(block.bytes))
+        self.assertEqual(0x100 // 4, len(list(block.words())))
+        self.assertTrue(str(block).startswith("Copy 0x01234567 89ABCDEF 01234567"))
+        self.assertTrue(str(block).endswith(f" ...(256 bytes) to {block.hex_address(True)}"))
+        self.assertEqual(Patch.PREVIEW // 4, str(block).count("01234567") + str(block).count("89ABCDEF"))
+
     def test_Memory(self):
         block = self.factory.create_block("F7000000 0003FFC0")
         self.assertIsNotNone(block)
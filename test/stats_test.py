@@ -0,0 +1,73 @@
+import unittest
+
+from artalk.parser import Parser, BlockFactory, BlockCache
+from artalk.stats import ParseStats
+
+
+class ParseStatsTest(unittest.TestCase):
+    DOCUMENT = "Notes\n[Pokémon Generator]\nD3000000 00000000\n01234567 89ABCDEF\n11234567 000089AB\n\n" \
+               "[Infinite Money]\nE2001000 00000010\n01234567 89ABCDEF\n01234567 89ABCDEF\n01234567 89ABCDEF\n"
+
+    def test_parse(self):
+        stats = ParseStats()
+        Parser(stats=stats).parse(self.DOCUMENT)
+        self.assertEqual({"SetOffset1": 1, "WWrite": 2, "SWrite": 1, "Patch": 3},
+                         {name: block.lines for name, block in stats.blocks.items()})
+        self.assertEqual(24, stats.blocks["Patch"].bytes)
+        self.assertEqual((1, 10), (stats.runs, stats.lines))
+        self.assertGreater(stats.seconds, 0)
+        self.assertGreater(stats.lines_per_second, 0)
+        self.assertGreater(stats.blocks["WWrite"].seconds, 0)
+        self.assertEqual(0, sum(block.failures for block in stats.blocks.values()))
+
+    def test_failures(self):
+        stats = ParseStats()
+        factory = BlockFactory(stats=stats)
+        self.assertRaises(Exception, factory.create_block, "11234567 12345678")
+        self.assertRaises(Exception, factory.create_block, "D3000001 00000000")
+        self.assertEqual(1, stats.blocks["SWrite"].failures)
+        self.assertEqual(1, stats.blocks[ParseStats.UNKNOWN].failures)
+        self.assertEqual(0, stats.blocks["SWrite"].lines)
+
+    def test_cache(self):
+        stats = ParseStats()
+        Parser(BlockCache(), stats).parse(self.DOCUMENT + "[Again]\n01234567 89ABCDEF\n")
+        self.assertEqual(3, stats.blocks["WWrite"].lines)
+
+    def test_disabled(self):
+        factory = BlockFactory()
+        self.assertNotIn("create", vars(factory))
+        self.assertIsNone(Parser().stats)
+
+    def test_iterParse(self):
+        stats = ParseStats()
+        codes = list(Parser(stats=stats).iter_parse(self.DOCUMENT.splitlines(keepends=True)))
+        self.assertEqual(2, len(codes))
+        self.assertEqual((1, 10), (stats.runs, stats.lines))
+
+    def test_parseParallel(self):
+        document = "".join(f"[Code {i}]\nD3000000 {i:08X}\n01234567 89ABCDEF\n\n" for i in range(100))
+        serial = ParseStats()
+        Parser(stats=serial).parse(document)
+        parallel = ParseStats()
+        Parser(stats=parallel).parse_parallel(document, workers=2, chunks=4)
+        self.assertEqual(serial.lines, parallel.lines)
+        self.assertEqual({name: block.lines for name, block in serial.blocks.items()},
+                         {name: block.lines for name, block in parallel.blocks.items()})
+
+    def test_prometheus(self):
+        stats = ParseStats()
+        Parser(stats=stats).parse(self.DOCUMENT)
+        text = stats.to_prometheus()
+        self.assertIn("# TYPE artalk_block_lines_total counter\n", text)
+        self.assertIn('artalk_block_lines_total{type="WWrite"} 2\n', text)
+        self.assertIn('artalk_block_bytes_total{type="Patch"} 24\n', text)
+        self.assertIn("artalk_lines_total 10\n", text)
+        self.assertIn("# TYPE artalk_lines_per_second gauge\n", text)
+        for line in text.splitlines():
+            if not line.startswith("#"):
+                float(line.rsplit(" ", 1)[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+
+from artalk.memory import MemoryImage
+from artalk.parser import Parser
+from artalk.vm import Machine
+
+
+class MachineTest(unittest.TestCase):
+    def setUp(self):
+        self.memory = MemoryImage(0x10000)
+        self.machine = Machine(self.memory)
+
+    def run_code(self, text: str):
+        code = Parser().parse("[Test]\n" + text)[0]
+        self.machine.run(code)
+        return code
+
+    def test_writes(self):
+        self.run_code("D3000000 00000100\n00000010 12345678\n10000020 0000ABCD\n20000030 000000EF\n")
+        self.assertEqual(0x12345678, self.memory.read32(0x110))
+        self.assertEqual(0xABCD, self.memory.read16(0x120))
+        self.assertEqual(0xEF, self.memory.read8(0x130))
+
+    def test_conditional32(self):
+        self.memory.write32(0x100, 5)
+        self.run_code("50000100 00000005\n00000200 00000001\nD0000000 00000000\n"
+                      "60000100 00000005\n00000204 00000001\nD0000000 00000000\n"
+                      "30000100 00000006\n00000208 00000001\nD0000000 00000000\n"
+                      "40000100 00000006\n0000020C 00000001\nD0000000 00000000\n")
+        self.assertEqual([1, 0, 1, 0], [self.memory.read32(0x200 + 4 * i) for i in range(4)])
+
+    def test_conditional16(self):
+        self.memory.write16(0x100, 0x12FF)
+        self.run_code("90000100 00FF1200\n00000200 00000001\nD0000000 00000000\n"
+                      "90000100 00001200\n00000204 00000001\nD0000000 00000000\n")
+        self.assertEqual([1, 0], [self.memory.read32(0x200), self.memory.read32(0x204)])
+
+    def test_nestedSkip(self):
+        self.run_code("50000100 00000001\nC0000000 00000004\n00000200 00000001\nD1000000 00000004\n"
+                      "D0000000 00000000\n00000300 00000001\n")
+        self.assertEqual(0, self.memory.read32(0x200))
+        self.assertEqual(1, self.memory.read32(0x300))
+
+    def test_loop(self):
+        self.run_code("D3000000 00000100\nC0000000 00000004\n20000000 000000AA\nD1000000 00000002\n"
+                      "20000000 000000BB\n")
+        self.assertEqual(b"\xAA\x00" * 4 + b"\xBB", self.memory.read(0x100, 9))
+        self.assertEqual(0x108, self.machine.offset)
+
+    def test_loadOffset(self):
+        self.memory.write32(0x100, 0x400)
+        self.run_code("B0000100 00000000\n00000010 00000001\n")
+        self.assertEqual(1, self.memory.read32(0x410))
+
+    def test_dxdata(self):
+        self.memory.write32(0x100, 41)
+        self.run_code("D6000000 00000100\nD4000000 00000001\nD3000000 00000200\nD9000000 00000000\n"
+                      "DA000000 00000000\nDB000000 00000000\nDC000000 00000010\nD5000000 00000007\n"
+                      "D9000000 00000000\n")
+        self.assertEqual(b"\x2A\x00\x00\x00\x2A\x00\x2A", self.memory.read(0x200, 7))
+        self.assertEqual(7, self.memory.read32(0x217))
+        self.assertEqual(0x21B, self.machine.offset)
+
+    def test_buttons(self):
+        code = self.run_code("DD000000 00000041\n00000100 00000001\nD0000000 00000000\n")
+        self.assertEqual(0, self.memory.read32(0x100))
+        self.machine.buttons = 0x41 | 0x200
+        self.machine.run(code)
+        self.assertEqual(1, self.memory.read32(0x100))
+
+    def test_copies(self):
+        self.run_code("E0000100 00000006\n12345678 0000AABB\nD3000000 00000100\nF0000200 00000006\n")
+        self.assertEqual(bytes.fromhex("78563412BBAA"), self.memory.read(0x200, 6))
+
+    def test_reset(self):
+        self.run_code("D3000000 00000100\n50000000 00000001\nD2000000 00000000\n00000010 00000001\n")
+        self.assertEqual(1, self.memory.read32(0x10))
+
+    def test_unbalanced(self):
+        self.assertRaises(Exception, self.run_code, "D0000000 00000000\n")
+
+    def test_recompiles(self):
+        code = self.run_code("00000100 00000001\n")
+        program = self.machine.program(code)
+        self.assertIs(program, self.machine.program(code))
+        code.add_block("00000104", "00000002")
+        self.machine.run(code)
+        self.assertEqual(2, self.memory.read32(0x104))
+
+
+if __name__ == '__main__':
+    unittest.main()